@@ -1,17 +1,207 @@
 #!/usr/bin/env python
+'''
+Play a match without display, with a fixed random seed and a fixed timestep,
+so two runs on the same code do the same thing, and report how fast it was:
+
+    ./profiler.py -l rizland -p AI5blob,AI5xeon -s 60
+    ./profiler.py --save-baseline bench.json    # remember the results
+    ./profiler.py --baseline bench.json         # and compare with them
+
+The comparison fails (exit status 1) if the simulated frames per second or
+the peak memory got worse than the baseline by more than the threshold, the
+medians of the phases are only printed. The game updates the ai simulates to
+choose its moves are counted in its phase, not in the phases of the game.
+With --profile, the match is run under cProfile, with --physics numpy, the
+physics are integrated with numpy (see usf.physics).
+'''
+
 import cProfile
-from usf import main
+import json
+import os
+import random
 import sys
+import time
+from argparse import ArgumentParser
+
+from usf import CONFIG
+from usf.ai import AI
+from usf.game import Game
+from usf import physics
+from usf.timing import timer
+
+try:
+    import resource
+except ImportError:
+    # not on windows
+    resource = None
+
+
+def peak_memory():
+    """ return the maximum memory used by the process, in kilobytes, or None
+    if it's not known on this platform
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        # bytes there
+        peak /= 1024
+    return peak
+
+
+def play(level, players, seconds, seed):
+    """ play a match of seconds simulated seconds, return the number of
+    frames and the time it took.
+    """
+    random.seed(seed)
+    CONFIG.debug.TIMINGS = True
+    timer.reset()
+
+    game = Game(None, level, ['characters/' + p for p in players])
+    ai = AI()
+    step = 1.0 / CONFIG.general.TICK_RATE
+    frames = int(seconds * CONFIG.general.TICK_RATE)
+
+    start = time.time()
+    for frame in xrange(frames):
+        if game.tick(step) == 'menu':
+            frames = frame + 1
+            break
+
+        with timer('ai'):
+            for i, player in enumerate(game.players):
+                if player.ai and player.present:
+                    ai.update(game, i)
+
+        timer.end_frame()
+
+    return frames, time.time() - start
+
+
+def results(args):
+    """ play the match described by the command line, and return its results
+    as a dict
+    """
+    frames, duration = play(
+            args.level, args.players.split(','), args.seconds, args.seed)
+
+    # the phases don't overlap (the updates simulated by the ai are only
+    # counted in its phase), so they can't take more than the whole run
+    timed = sum(sum(frame.values()) for frame in timer.frames)
+    if timed > duration * 1000 * 1.01:
+        print 'warning: the phases took %.1f ms in %.1f ms, some are' % (
+                timed, duration * 1000),
+        print 'counted twice'
+
+    return {
+            'match': {
+                'level': args.level,
+                'players': args.players,
+                'seconds': args.seconds,
+                'seed': args.seed,
+                'physics': physics.backend,
+                'tick_rate': CONFIG.general.TICK_RATE},
+            'frames': frames,
+            'duration': duration,
+            'fps': frames / duration,
+            'frame_time': duration * 1000 / frames,
+            'peak_memory': peak_memory(),
+            'phases': dict(
+                (name, {
+                    'median': timer.percentile(name, 50),
+                    'p95': timer.percentile(name, 95),
+                    'total': sum(f.get(name, 0) for f in timer.frames)})
+                for name in timer.phases)}
+
+
+def report(result):
+    print '%(frames)d frames in %(duration).2fs: %(fps).1f fps' % result,
+    print '(%(frame_time).3f ms per frame)' % result
+    if result['peak_memory'] is not None:
+        print 'peak memory: %d kB' % result['peak_memory']
+
+    print '%-16s %10s %10s %10s' % ('phase', 'median ms', 'p95 ms', 'total ms')
+    for name, phase in sorted(
+            result['phases'].items(), key=lambda x: -x[1]['total']):
+        print '%-16s %10.3f %10.3f %10.1f' % (
+                name, phase['median'], phase['p95'], phase['total'])
+
+
+def compare(result, baseline, threshold):
+    """ print the differences with the baseline, return False if the fps or
+    memory got worse by more than threshold percents
+    """
+    if result['match'] != baseline['match']:
+        print 'warning: the baseline was measured on another match:',
+        print baseline['match']
+
+    ok = True
+    for key, better in (('fps', 1), ('peak_memory', -1)):
+        if result.get(key) is None or baseline.get(key) is None:
+            continue
+
+        change = (result[key] - baseline[key]) * 100.0 / baseline[key]
+        regression = change * better < -threshold
+        print '%s: %.1f -> %.1f (%+.1f%%)%s' % (
+                key, baseline[key], result[key], change,
+                regression and ' REGRESSION' or '')
+        ok = ok and not regression
+
+    for name, phase in sorted(result['phases'].items()):
+        if name in baseline['phases']:
+            print '%-16s median %.3f -> %.3f ms' % (
+                    name, baseline['phases'][name]['median'], phase['median'])
+
+    return ok
+
+
+def make_parser():
+    parser = ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('-l', '--level', default='rizland')
+    parser.add_argument('-p', '--players', default='AI5blob,AI5xeon',
+            help='comma separated characters, prefixed by AI and its level')
+    parser.add_argument('-s', '--seconds', type=float, default=60,
+            help='simulated seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--physics', choices=('python', 'numpy'),
+            default='python', help='physics backend')
+    parser.add_argument('--baseline', help='json file to compare with')
+    parser.add_argument('--save-baseline', help='json file to write')
+    parser.add_argument('--threshold', type=float, default=10,
+            help='accepted regression, in percents')
+    parser.add_argument('--profile', metavar='FILE',
+            help='run under cProfile, and write the stats in FILE')
+    return parser
 
 
 def main_():
-    sys.argv = ['./ultimate-smash-friends', '-p', 'AIblob,AIxeon', '-l',
-            'rizland']
-    m = main.Main()
-    m.init()
-    cProfile.runctx("m.run()", globals(), locals(), filename="usf.profile")
+    args = make_parser().parse_args()
+    physics.backend = args.physics
+
+    if args.profile:
+        namespace = {'args': args}
+        cProfile.runctx(
+                'result = results(args)', globals(), namespace,
+                filename=args.profile)
+        result = namespace['result']
+    else:
+        result = results(args)
+
+    report(result)
+
+    if args.save_baseline:
+        f = open(args.save_baseline, 'w')
+        json.dump(result, f, indent=4, sort_keys=True)
+        f.close()
+
+    if args.baseline and os.path.exists(args.baseline):
+        f = open(args.baseline)
+        baseline = json.load(f)
+        f.close()
+        if not compare(result, baseline, args.threshold):
+            sys.exit(1)
 
 
 if __name__ == '__main__':
     main_()
-
@@ -0,0 +1,72 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.atlas' from the root folder of usf
+
+# This file contains a testsuite for usf.atlas
+
+import os
+import unittest
+
+import pygame
+
+from usf import atlas
+from usf import loaders
+from usf.prefetch import character_assets
+
+
+class TestAtlas(unittest.TestCase):
+
+    def setUp(self):
+        # the sheets are converted to the format of the display
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.init()
+        pygame.display.set_mode((800, 480), 0, 32)
+        self.images = tuple(sorted(set(
+            character_assets('characters/blob')[0][1:])))
+
+        # one of them was already loaded
+        loaders.image(self.images[0])
+        self.atlas = atlas.Atlas('test', self.images)
+
+    def tearDown(self):
+        loaders.IMAGE_CACHE.clear()
+
+    def test_not_cached(self):
+        for image in self.images:
+            self.assertFalse(loaders.cached(image), image)
+
+    def test_mip_levels(self):
+        # the frames stay apart in the smallest halved sheet
+        step = 2 ** atlas.MIP_LEVELS
+        regions = {}
+        for image in self.images:
+            sheet, rect = self.atlas.region(image)
+            self.assertEqual((rect.x % step, rect.y % step), (0, 0))
+            regions.setdefault(sheet, []).append(pygame.Rect(
+                rect.x / step - atlas.PADDING / 2,
+                rect.y / step - atlas.PADDING / 2,
+                -(-rect.w // step) + atlas.PADDING,
+                -(-rect.h // step) + atlas.PADDING))
+
+        for rects in regions.values():
+            for i, rect in enumerate(rects):
+                self.assertEqual(rect.collidelist(rects[i + 1:]), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.hits' from the root folder of usf
+
+# This file contains a testsuite for the backends of usf.hits
+
+import random
+import unittest
+
+import pygame
+
+from usf import hits
+
+
+class Entity(object):
+    """ the attributes of usf.entity.Entity used by hits
+    """
+
+    def __init__(self, rect, points):
+        self.rect = pygame.Rect(rect)
+        self.agressiv_points = points
+        self.reach = self.rect.unionall([
+            pygame.Rect(
+                self.rect[0] + point[0][0] - hits.SIZE / 2,
+                self.rect[1] + point[0][1] - hits.SIZE / 2,
+                hits.SIZE,
+                hits.SIZE)
+            for point in points])
+
+
+def entities(count):
+    result = []
+    for i in xrange(count):
+        # some of them are empty
+        w = random.choice((0, random.randint(1, 60)))
+        h = random.choice((0, random.randint(1, 60)))
+        points = [
+                ((random.randint(-10, 70), random.randint(-10, 70)), (i, j))
+                for j in xrange(random.randint(0, 4))]
+        result.append(Entity(
+            (random.randint(0, 200), random.randint(0, 200), w, h), points))
+
+    return result
+
+
+class TestBackends(unittest.TestCase):
+
+    @unittest.skipIf(hits.numpy is None, 'numpy is not installed')
+    def test_same_hits(self):
+        random.seed(0)
+        for i in xrange(200):
+            game = entities(8)
+            self.assertEqual(
+                    hits._find_python(game), hits._find_numpy(game))
+
+    def test_empty(self):
+        target = Entity((10, 10, 0, 0), [])
+        entity = Entity((0, 0, 20, 20), [((10, 10), (0, 0))])
+        self.assertEqual(hits.find([entity, target]), [])
+
+        target.rect.size = (10, 10)
+        target.reach = target.rect
+        self.assertEqual(
+                hits.find([entity, target]),
+                [(entity, target, entity.agressiv_points[0])])
+
+
+if __name__ == '__main__':
+    unittest.main()
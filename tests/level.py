@@ -0,0 +1,72 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.level' from the root folder of usf
+
+# This file contains a testsuite for the moving blocks of usf.level, and a run
+# of the default benchmark match, that goes through all their patterns
+
+import os
+import unittest
+
+from usf import CONFIG
+from usf.level import MovingPart
+from usf.timing import timer
+
+import profiler
+
+class TestMovingPart(unittest.TestCase):
+
+    def setUp(self):
+        patterns = [
+                {'position': [0, 0], 'time': 1},
+                {'position': [100, 0], 'time': 10000},
+                {'position': [100, 100], 'time': 20000}]
+        self.part = MovingPart(
+                [(0, 0, 10, 10)], patterns, 'rizland-pod.png', 'rizland', None)
+
+    def test_on_pattern(self):
+        # level_time * 10000 lands exactly on the time of a pattern
+        self.part.update(1.0)
+        self.assertEqual(self.part.position, [100, 0])
+
+    def test_between(self):
+        self.part.update(1.5)
+        self.assertEqual(self.part.position, [100, 50])
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        self.timings = CONFIG.debug.TIMINGS
+
+    def tearDown(self):
+        CONFIG.debug.TIMINGS = self.timings
+        timer.reset()
+
+    def test_default_match(self):
+        # the match goes to its end (or to the default length), past 22.8 s
+        # where the moving blocks of rizland hit the time of a pattern
+        args = profiler.make_parser().parse_args([])
+        result = profiler.results(args)
+        self.assertTrue(result['frames'] > 25 * CONFIG.general.TICK_RATE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.memoize' from the root folder of usf
+
+# This file contains a testsuite for memoize.memoize and memoize.SizedCache
+
+from usf.memoize import memoize, memoize_with, stats, SizedCache
+
+import unittest
+
+
+class TestSizedCache(unittest.TestCase):
+
+    def setUp(self):
+        # keys are (name, derived) tuples, values are sized by their length
+        self.cache = SizedCache(10, len, lambda key: 0 if key[1] else 1, 2)
+
+    def test_budget(self):
+        self.cache[('a', False)] = 'xxxx'
+        self.cache[('b', False)] = 'xxxx'
+        self.assertEqual(self.cache.size, 8)
+
+        # the least recently used value is evicted
+        self.cache[('a', False)]
+        self.cache[('c', False)] = 'xxxx'
+        self.assertTrue(('a', False) in self.cache)
+        self.assertFalse(('b', False) in self.cache)
+        self.assertEqual(self.cache.size, 8)
+
+    def test_tiers(self):
+        self.cache[('a', True)] = 'xxxx'
+        self.cache[('b', False)] = 'xxxx'
+        self.cache[('b', False)]
+        self.cache[('a', True)]
+
+        # derived values are evicted first, even if recently used
+        self.cache[('c', False)] = 'xxxx'
+        self.assertFalse(('a', True) in self.cache)
+        self.assertTrue(('b', False) in self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_replace(self):
+        self.cache[('a', False)] = 'xxxx'
+        self.cache[('a', False)] = 'xx'
+        self.assertEqual(self.cache.size, 2)
+        self.assertEqual(self.cache[('a', False)], 'xx')
+
+    def test_memoize_with(self):
+        calls = []
+
+        @memoize_with(self.cache)
+        def double(name, derived=False):
+            calls.append(name)
+            return name * 2
+
+        self.assertEqual(double('aaa', derived=False), 'aaaaaa')
+        self.assertEqual(double('aaa', derived=False), 'aaaaaa')
+        self.assertEqual(calls, ['aaa'])
+        self.assertEqual(self.cache.size, 6)
+        self.assertTrue(double.cache is self.cache)
+
+
+class TestMemoize(unittest.TestCase):
+
+    def test(self):
+        calls = []
+
+        @memoize
+        def add(a, b=0):
+            calls.append((a, b))
+            return a + b
+
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(add(1, b=2), 3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(add.cache), 1)
+
+    def test_kwargs_order(self):
+        calls = []
+
+        @memoize
+        def sub(a=0, b=0):
+            calls.append((a, b))
+            return a - b
+
+        self.assertEqual(sub(a=3, b=1), 2)
+        self.assertEqual(sub(b=1, a=3), 2)
+        self.assertEqual(len(calls), 1)
+
+    def test_stats(self):
+        @memoize
+        def square(a):
+            return a * a
+
+        square(2)
+        square(2)
+        square(3)
+        self.assertEqual(square.stats.calls, 3)
+        self.assertEqual(square.stats.hits, 1)
+        self.assertEqual(square.stats.misses, 2)
+        self.assertEqual(square.stats.entries, 2)
+        self.assertTrue(square.stats in stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
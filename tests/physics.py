@@ -0,0 +1,79 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.physics' from the root folder of usf
+
+# This file contains a testsuite for the physics backends of usf.physics
+
+import os
+import random
+import unittest
+
+from usf import CONFIG
+from usf import physics
+from usf.ai import AI
+from usf.game import Game
+
+LEVEL = 'rizland'
+PLAYERS = ['characters/AI5blob', 'characters/AI5xeon', 'characters/AI5bearsum']
+TICKS = 1200
+
+
+def play(backend):
+    """ play a seeded match without display, and return the place and vector
+    of every entity at each tick
+    """
+    physics.backend = backend
+    random.seed(0)
+
+    game = Game(None, LEVEL, PLAYERS)
+    ai = AI()
+    step = 1.0 / CONFIG.general.TICK_RATE
+    states = []
+    for tick in xrange(TICKS):
+        game.tick(step)
+        for i, player in enumerate(game.players):
+            if player.ai and player.present:
+                ai.update(game, i)
+
+        states.append([
+            (tuple(entity.place), tuple(entity.vector), entity.on_ground)
+            for entity in game.players + game.items])
+
+    return states
+
+
+class TestBackends(unittest.TestCase):
+
+    def setUp(self):
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        self.backend = physics.backend
+
+    def tearDown(self):
+        physics.backend = self.backend
+
+    @unittest.skipIf(physics.numpy is None, 'numpy is not installed')
+    def test_same_results(self):
+        expected = play('python')
+        result = play('numpy')
+        for tick, (a, b) in enumerate(zip(expected, result)):
+            self.assertEqual(a, b, 'the backends differ at tick %d' % tick)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.prefetch' from the root folder of usf
+
+# This file contains a testsuite for usf.prefetch
+
+import os
+import unittest
+
+import pygame
+
+from usf import loaders
+from usf.prefetch import Prefetcher, level_assets
+
+
+class TestLevels(unittest.TestCase):
+
+    def setUp(self):
+        # the images are converted to the format of the display
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.init()
+        pygame.display.set_mode((800, 480), 0, 32)
+        self.prefetcher = Prefetcher(2)
+
+    def tearDown(self):
+        loaders._image.cache.clear()
+
+    def test_last_level(self):
+        for level in ('biglevel', 'jungle', 'rizland'):
+            self.prefetcher.add_level(level)
+        self.prefetcher.finish()
+
+        expected = set(level_assets('rizland'))
+        for name in set(level_assets('biglevel') + level_assets('jungle')):
+            if name not in expected:
+                self.assertFalse((name,) in loaders._image.cache, name)
+        for name in expected:
+            self.assertTrue((name,) in loaders._image.cache, name)
+
+    def test_match(self):
+        self.prefetcher.add_level('jungle')
+        self.prefetcher.add_match('rizland', [])
+        self.prefetcher.finish()
+
+        self.assertEqual(self.prefetcher.progress(), 1)
+        self.assertFalse(self.prefetcher.pending)
+        for name in level_assets('rizland'):
+            self.assertTrue((name,) in loaders._image.cache, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
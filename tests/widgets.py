@@ -0,0 +1,86 @@
+################################################################################
+# This file is part of Ultimate Smash Friends                                  #
+#                                                                              #
+# Ultimate Smash Friends is free software: you can redistribute it and/or      #
+# modify it under the terms of the GNU General Public License as published by  #
+# the Free Software Foundation, either version 3 of the License, or (at your   #
+# option) any later version.                                                   #
+#                                                                              #
+# Ultimate Smash Friends is distributed in the hope that it will be useful, but#
+# WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or#
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU General Public License for    #
+# more details.                                                                #
+#                                                                              #
+# You should have received a copy of the GNU General Public License along with #
+# Ultimate Smash Friends.  If not, see <http://www.gnu.org/licenses/>.         #
+################################################################################
+
+# Launch this files using 'python -m tests.widgets' from the root folder of usf
+
+# This file contains a testsuite for the cache of widgets.box.Container
+
+import os
+import unittest
+
+import pygame
+
+from usf import CONFIG
+from usf.widgets import widget
+from usf.widgets.box import VBox
+from usf.widgets.label import Label
+from usf.widgets.special import KeyboardWidget
+
+
+class TestContainerCache(unittest.TestCase):
+
+    def setUp(self):
+        # We need to init pygame and to create a display to draw the widgets
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        pygame.init()
+        pygame.display.set_mode((800, 480), 0, 32)
+        CONFIG.display.CACHE_WIDGETS = True
+
+        self.box = VBox()
+        self.label = Label('a rather long text')
+        self.key = KeyboardWidget('K_a')
+        self.box.add(self.label)
+        self.box.add(self.key)
+
+        self.box.draw()
+        self.cache = self.box.cache
+        self.assertTrue(self.cache is not None)
+        widget.pop_dirty()
+
+    def assertRedrawn(self, rect):
+        # the container draws itself again, and the place is drawn again
+        self.assertTrue(self.box.cache is None)
+        self.assertTrue(
+                rect.collidelist(widget.pop_dirty()) != -1)
+
+        self.box.draw()
+        self.assertTrue(self.box.cache is not None)
+        self.assertTrue(self.box.cache is not self.cache)
+
+    def test_text(self):
+        old = self.label.rect
+        self.label.set_text('a')
+        self.assertTrue(self.label.rect.width < old.width)
+
+        dirty = widget.pop_dirty()
+        # all the place of the old text is drawn again
+        self.assertTrue(any(rect.contains(old) for rect in dirty))
+        widget.DIRTY.extend(dirty)
+        self.assertRedrawn(old)
+
+    def test_focus(self):
+        self.key.focus = True
+        self.assertRedrawn(self.key.rect)
+
+    def test_unchanged(self):
+        self.box.draw()
+        self.assertTrue(self.box.cache is self.cache)
+        self.assertEqual(widget.pop_dirty(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,7 @@ import random
 # usf modules
 
 from usf.memoize import memoize
+from usf.timing import timer
 
 from usf import CONFIG
 #controls = controls.Controls()
@@ -94,7 +95,9 @@ def simulate(game, iam, m):
             game,
             {'entity': entity})
 
-    game.update(deltatime=TIMESTEP)
+    # the simulated update is part of the time of the ai, not of the game
+    with timer.paused():
+        game.update(deltatime=TIMESTEP)
 
 
 def under_lowest_plateform(game, player):
@@ -215,7 +218,9 @@ def search_path(game, iam, max_depth):
     for movement in movements:
         scores.extend(try_movement(movement, game, gametime, iam, others, h))
 
-    scores.sort()
+    # only by score, equal scores would be ordered by the address of their
+    # movements, which changes from a run to the other
+    scores.sort(key=lambda score: score[0])
 
     b = game.backup()
     if max_depth == 0:
@@ -234,7 +239,7 @@ def search_path(game, iam, max_depth):
 
     #print "max_depth", max_depth, "best result", result
     game.restore(b)
-    return min(result)
+    return min(result, key=lambda score: score[0])
 
 
 class Movement(object):
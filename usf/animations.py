@@ -52,6 +52,9 @@ class Frame (object):
         """
         self.image = image
         self.trails = trails
+        # set when the frame is packed in an atlas
+        self.sheet = None
+        self.area = None
         self.time = int(gametime)
         if type(hardshape) is str:
             self.hardshape = pygame.Rect([int(i) for i in hardshape.split(' ')])
@@ -61,7 +64,7 @@ class Frame (object):
             logging.error('incorrect type for hardshape: ', hardshape)
 
         self.hardshape_reverse = (
-            loaders.image(self.image)[1][2]
+            loaders.image_rect(self.image)[2]
                 - self.hardshape[0] - self.hardshape[2],
             self.hardshape[1],
             self.hardshape[2],
@@ -90,7 +93,9 @@ class PreciseTimedAnimation(object):
     def __init__(self, frames, attribs, server=False):
         self.frames = frames
         self.image = frames[0].image
-        self.rect = loaders.image(self.image, nodisplay=server)[1]
+        self.sheet = frames[0].sheet
+        self.area = frames[0].area
+        self.rect = loaders.image_rect(self.image)
         self._start_time = 0
         self.playing = 0
 
@@ -141,6 +146,8 @@ class PreciseTimedAnimation(object):
             else:
                 frame = self.frame(gametime - self._start_time)
                 self.image = frame.image
+                self.sheet = frame.sheet
+                self.area = frame.area
                 self.trails = frame.trails
 
                 if reverse:
@@ -151,5 +158,5 @@ class PreciseTimedAnimation(object):
                     self.agressivpoints = frame.agressivpoints
                     self.hardshape = frame.hardshape
 
-            self.rect = loaders.image(self.image, nodisplay=server)[1]
+            self.rect = loaders.image_rect(self.image)
 
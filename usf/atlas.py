@@ -0,0 +1,154 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+An atlas packs the frames of a character into a few big images, the sheets.
+The reversed, lightened and zoomed versions are then computed once per sheet
+instead of once per frame, and the game handles a few big surfaces instead of
+hundreds of small ones.
+
+Sheets are given to loaders under a virtual name, so loaders.image transforms
+and caches them like any other image, and a frame is drawn by blitting its
+area of the sheet:
+
+    atlas = build('characters/stick', images)
+    sheet, area = atlas.region(images[0])
+    img, area = atlas.get(sheet, area, reversed=True, zoom=.5)
+    surface.blit(img, coords, area)
+
+'''
+
+import pygame
+
+from usf import loaders
+from usf.memoize import memoize
+
+SHEET_SIZE = 1024
+# empty pixels around each frame, so zooming a sheet doesn't bleed the border
+# of a frame into its neighbours
+PADDING = 2
+# a zoomed out sheet is scaled from its halved versions (see loaders._mip),
+# the frames are placed on multiples of 2 ** MIP_LEVELS pixels, and the
+# padding is multiplied by it, so it's still PADDING pixels in the smallest
+# of them.
+MIP_LEVELS = 3
+
+
+class Atlas(object):
+    """
+    Pack images in sheets, line by line ("shelves"), the highest images first.
+
+    The sizes of the images are read from the index of their directory, and
+    their pixels are only kept in the sheets, not in the image cache.
+    """
+
+    def __init__(self, name, images, size=SHEET_SIZE, padding=PADDING,
+            mip_levels=MIP_LEVELS):
+        self.regions = {}
+        self.sizes = {}
+        self.step = 2 ** mip_levels
+        padding *= self.step
+
+        images = sorted(
+                set(images), key=lambda x: -loaders.image_rect(x)[3])
+        sheets = [[]]
+        x = y = padding
+        shelf = 0
+        for image in images:
+            w, h = loaders.image_rect(image)[2:]
+            if x + w + padding > size and x > padding:
+                # next shelf
+                x = padding
+                y = self._align(y + shelf + padding)
+                shelf = 0
+
+            if y + h + padding > size and sheets[-1]:
+                # next sheet
+                sheets.append([])
+                x = y = padding
+                shelf = 0
+
+            sheets[-1].append((image, pygame.Rect(x, y, w, h)))
+            x = self._align(x + w + padding)
+            shelf = max(shelf, h)
+
+        for i, sheet in enumerate(sheets):
+            if sheet:
+                self._build('atlas:%s:%d' % (name, i), sheet, padding)
+
+    def _align(self, value):
+        """ return the first multiple of step from value
+        """
+        return -(-value // self.step) * self.step
+
+    def _build(self, sheet_name, sheet, padding):
+        """ blit the images on a new surface, and register it in loaders
+        """
+        width = self._align(max(rect.right for image, rect in sheet) + padding)
+        height = self._align(
+                max(rect.bottom for image, rect in sheet) + padding)
+        surface = pygame.Surface((width, height), pygame.locals.SRCALPHA)
+
+        for image, rect in sheet:
+            # the prefetcher may have loaded it already
+            if loaders.cached(image):
+                surface.blit(loaders.image(image)[0], rect)
+                loaders.forget(image)
+            else:
+                surface.blit(loaders.decode(image), rect)
+            self.regions[image] = (sheet_name, rect)
+
+        self.sizes[sheet_name] = (width, height)
+        loaders.SURFACES[sheet_name] = surface.convert_alpha()
+
+    def __contains__(self, image):
+        return image in self.regions
+
+    def region(self, image):
+        """ return the name of the sheet containing image, and its area in it
+        """
+        return self.regions[image]
+
+    def get(self, sheet, area, reversed=False, lighten=False, zoom=1):
+        """ return the transformed sheet, and the area of the frame in it
+        """
+        x, y, w, h = area
+        if reversed:
+            x = self.sizes[sheet][0] - x - w
+
+        left = int(x * zoom)
+        top = int(y * zoom)
+        return (
+                loaders.image(
+                    sheet,
+                    reversed=reversed,
+                    lighten=lighten,
+                    zoom=zoom)[0],
+                pygame.Rect(
+                    left,
+                    top,
+                    int((x + w) * zoom) - left,
+                    int((y + h) * zoom) - top))
+
+
+@memoize
+def build(name, images):
+    """ return the atlas of the images, shared by every entity using them
+    """
+    return Atlas(name, images)
@@ -89,6 +89,9 @@ MUSIC_VOLUME = 100
 
 [display]
 SHOW_FPS = False
+SHOW_CACHE_STATS = False
+DIRTY_RECTS = True
+CACHE_WIDGETS = True
 FULLSCREEN = False
 
 [general]
@@ -97,6 +100,8 @@ NOTIF_EFFECT = True
 WIDTH = 0
 MAX_FPS = 30
 MAX_GUI_FPS = 30
+TICK_RATE = 60
+MAX_CATCHUP_STEPS = 5
 LOG_FILENAME = usf.log
 GRAVITY = 1962
 INVINCIBLE_TIME = 3000
@@ -107,11 +112,17 @@ THEME = tty
 CONFIRM_EXIT = True
 ZOOM_SHARPNESS = 50
 SMOOTHSCALE = True
+ASYNC_RESCALE = True
 JUMPHEIGHT = 48.0
 SHIELD_SOLIDITY = 6000.0
 POWER_SHIELD_TIME = 0.2
 SMOOTH_SCROLLING = True
 BOUNCE = .2
+IMAGE_CACHE_SIZE = 256
+PREFETCH_WORKERS = 2
+PREFETCH_BUDGET = 4
+DISK_CACHE = False
+DISK_CACHE_SIZE = 1024
 
 [debug]
 DEBUG = True
@@ -124,6 +135,7 @@ LEVELSHAPES = False
 LOG_FILENAME = usf.log
 LOG_LEVEL = WARN
 LEVELMAP = False
+TIMINGS = False
 """
 
 class Section(object):
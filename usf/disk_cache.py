@@ -0,0 +1,203 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+An on-disk store of decoded images, so the pngs of levels and characters are
+only decompressed once, and not at every launch.
+
+Each image is kept as raw RGBA pixels after a small header, which holds the
+size and modification time of the source file, an entry is dropped when they
+don't match anymore. Entries are read through mmap, without copy, and the
+least recently used ones are removed when the store grows over
+DISK_CACHE_SIZE megabytes.
+
+It's used by loaders when DISK_CACHE is set in the config.
+'''
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+
+import pygame
+
+from usf import CONFIG
+
+MAGIC = 'USF1'
+# magic, size and mtime of the source file, width and height of the image
+HEADER = struct.Struct('<4sqdii')
+EXTENSION = '.rgba'
+# when the store is full, entries are removed until it's under this part of
+# the budget, so it's not scanned again at the next write
+LOW_WATER = 0.9
+
+# the number of bytes used by the store, counted once by make_room, then
+# updated at each write, images are stored from the prefetch threads.
+_used = [None]
+_lock = threading.Lock()
+
+
+def path():
+    """ return the directory of the store, in the user directory
+    """
+    return os.path.join(CONFIG.user_path, 'cache')
+
+
+def _entry(name):
+    return os.path.join(
+            path(),
+            hashlib.sha1(os.path.abspath(name)).hexdigest() + EXTENSION)
+
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+    except OSError:
+        # another thread was faster
+        pass
+
+
+def load(name):
+    """ return the image stored for the file name, or None if there is none,
+    or if the file changed since it was stored.
+    """
+    filename = _entry(name)
+    try:
+        stat = os.stat(name)
+        f = open(filename, 'rb')
+    except (IOError, OSError):
+        return None
+
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (mmap.error, ValueError):
+        # empty or unreadable entry
+        f.close()
+        _remove(filename)
+        return None
+    f.close()
+
+    magic, size, mtime, width, height = HEADER.unpack_from(data)
+    if (magic != MAGIC
+            or size != stat.st_size
+            or mtime != stat.st_mtime
+            or len(data) != HEADER.size + width * height * 4):
+        logging.debug('outdated disk cache entry for ' + name)
+        data.close()
+        _remove(filename)
+        return None
+
+    # keep the most recently used entries when making room
+    try:
+        os.utime(filename, None)
+    except OSError:
+        pass
+
+    # the surface keeps a reference on the mapping, which is closed with it
+    return pygame.image.frombuffer(
+            buffer(data, HEADER.size), (width, height), 'RGBA')
+
+
+def store(name, img):
+    """ save the pixels of img, decoded from the file name, it's written in a
+    temporary file first, so a half written entry is never read.
+    """
+    temp = None
+    try:
+        stat = os.stat(name)
+        if not os.path.isdir(path()):
+            os.makedirs(path())
+
+        fd, temp = tempfile.mkstemp(suffix='.tmp', dir=path())
+        f = os.fdopen(fd, 'wb')
+        try:
+            f.write(HEADER.pack(
+                MAGIC,
+                stat.st_size,
+                stat.st_mtime,
+                img.get_width(),
+                img.get_height()))
+            f.write(pygame.image.tostring(img, 'RGBA'))
+        finally:
+            f.close()
+
+        filename = _entry(name)
+        try:
+            replaced = os.path.getsize(filename)
+        except OSError:
+            replaced = 0
+
+        if os.name == 'nt':
+            # rename doesn't replace an existing file there
+            _remove(filename)
+        os.rename(temp, filename)
+        temp = None
+
+    except (IOError, OSError), e:
+        logging.warning('cannot write disk cache for ' + name + ': ' + str(e))
+        if temp is not None:
+            _remove(temp)
+        return
+
+    written = HEADER.size + img.get_width() * img.get_height() * 4
+    budget = CONFIG.general.DISK_CACHE_SIZE * 1024 * 1024
+    with _lock:
+        if _used[0] is not None:
+            _used[0] += written - replaced
+        full = _used[0] is None or _used[0] > budget
+
+    if full:
+        make_room(budget, int(budget * LOW_WATER))
+
+
+def make_room(budget, target=None):
+    """ if the store uses more than budget bytes, remove the least recently
+    used entries, until it uses less than target (by default, budget) bytes.
+    """
+    if target is None:
+        target = budget
+
+    try:
+        entries = []
+        for filename in os.listdir(path()):
+            if filename.endswith(EXTENSION):
+                stat = os.stat(os.path.join(path(), filename))
+                entries.append((stat.st_mtime, stat.st_size, filename))
+    except OSError:
+        return
+
+    total = sum(size for mtime, size, filename in entries)
+    if total > budget:
+        entries.sort()
+        while total > target and entries:
+            mtime, size, filename = entries.pop(0)
+            _remove(os.path.join(path(), filename))
+            total -= size
+
+    with _lock:
+        _used[0] = total
+
+
+def clear():
+    """ remove every entry of the store
+    """
+    make_room(0)
@@ -0,0 +1,97 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+A DrawList can be given instead of a surface to the draw methods of the game:
+it records the blits and fills, in order, and flush() sends them to the real
+surface, with one Surface.blits call for each run of blits.
+
+The last frame drawn is kept, so it can be counted or replayed on another
+surface.
+'''
+
+# marks the fill commands among the blits
+FILL = 'fill'
+
+
+class DrawList(object):
+    """
+    Record drawing commands for a surface, other surface methods (get_clip,
+    get_size...) are those of the surface.
+    """
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.commands = []
+        self.last = []
+
+    def __getattr__(self, name):
+        return getattr(self.surface, name)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        """ record a blit, same arguments as Surface.blit
+        """
+        self.commands.append((source, dest, area, special_flags))
+
+    def blits(self, blit_sequence, doreturn=True):
+        """ record blits, same arguments as Surface.blits
+        """
+        self.commands.extend(blit_sequence)
+
+    def fill(self, color, rect=None, special_flags=0):
+        """ record a fill, same arguments as Surface.fill
+        """
+        self.commands.append((FILL, color, rect, special_flags))
+
+    def flush(self):
+        """ draw the recorded commands on the surface, and start a new list
+        """
+        self.replay(self.surface, self.commands)
+        self.last = self.commands
+        self.commands = []
+
+    def replay(self, surface, commands=None):
+        """ draw the commands (by default, the ones of the last frame) on a
+        surface
+        """
+        if commands is None:
+            commands = self.last
+
+        batch = []
+        for command in commands:
+            if command[0] is FILL:
+                _blits(surface, batch)
+                batch = []
+                surface.fill(*command[1:])
+            else:
+                batch.append(command)
+
+        _blits(surface, batch)
+
+
+def _blits(surface, batch):
+    if hasattr(surface, 'blits'):
+        surface.blits(batch, False)
+    else:
+        # pygame < 1.9.4
+        for command in batch:
+            surface.blit(*command)
@@ -221,7 +221,7 @@ class Actor(object):
         """
         for block in blocks:
             if self.foot_rect.colliderect(block) == 1:
-                if not self.in_water:
+                if not self.in_water and not self.entity_skin.server:
                     loaders.track(os.path.join(CONFIG.system_path,
                         "sounds",
                         "splash1.wav")).play()
@@ -268,6 +268,9 @@ class Entity(Actor):
     # number of points cannot be changed currently due to not adaptative
     # collision method.
     nb_points = 8
+    # the most rects an entity is pushed through to get out of the level in
+    # one step
+    MAX_PUSH_ITERATIONS = 8
     ai = False
     ai_ = None
     list_sin_cos = [[
@@ -313,7 +316,8 @@ class Entity(Actor):
             self.entity_skin = EntitySkin(
                     entity_skinname,
                     not self._game or not self._game.screen,
-                    animation=animation)
+                    animation=animation,
+                    use_atlas=True)
 
             self._armor = self.entity_skin.armor
             self._rect = pygame.Rect(0, 0, 0, 0)
@@ -456,28 +460,30 @@ class Entity(Actor):
 
     def backup(self):
         """
-        save important attributes of the state of the player, to a dict
+        save important attributes of the state of the player, to a dict, the
+        values are copies, as some can be views on the arrays of the physics
+        (see usf.physics).
         """
-        assert isinstance(self._vector, list)
         d = {
             '_lives': self.lives,
             '_place': self.place[:],
             '_rect': pygame.Rect(self.rect[:]),
-            '_vector': self._vector[:],
+            '_vector': list(self._vector),
             '_walking_vector': self.walking_vector[:]}
 
         # would be easier with a dict comprehension, but not yet in 2.6
         for k in ('_reversed', '_percents', '_upgraded', '_present',
                 '_visible'):
-            d[k] = self.__dict__[k]
+            d[k] = getattr(self, k)
         return d
 
     def restore(self, backup):
         """
         restore the game to the state described in backup
         """
-        self.__dict__.update(backup)
-        assert isinstance(self._vector, list)
+        assert isinstance(backup['_vector'], list)
+        for key, value in backup.items():
+            setattr(self, key, value)
 
     @property
     def agressiv_points(self):
@@ -486,6 +492,18 @@ class Entity(Actor):
         """
         return self.entity_skin.animation.agressivpoints
 
+    @property
+    def reach(self):
+        """
+        return the rect covering the entity and its aggressive points, the
+        entity can't hit or be hit by anything outside of it
+        """
+        rect = self.rect
+        return rect.unionall([
+            pygame.Rect(rect[0] + point[0][0] - 3, rect[1] + point[0][1] - 3,
+                6, 6)
+            for point in self.agressiv_points])
+
     def test_hit(self, entity):
         """
         test entity aggressive points collisions with other entity
@@ -606,7 +624,7 @@ class Entity(Actor):
                     fonts['mono']['25']),
                     (coords[0], coords[1] - self.entity_skin.animation.rect[3]))
 
-    def draw(self, coords, zoom, surface, debug_params=dict()):
+    def draw(self, coords, zoom, surface, debug_params=dict(), shift=(0, 0)):
         """
         Draw the entity on the surface(i.e: the screen), applying coordinates
         offsets and zoom scaling as necessary, implementation depends on the
@@ -614,7 +632,8 @@ class Entity(Actor):
         containing respective height and width of the screen.
 
         coords is a tuple containing the current position of the camera, zoom is
-        the current zoom of the camera.
+        the current zoom of the camera, shift is an offset (in level
+        coordinates) to draw the entity between two updates.
 
         """
         # Draw a point on the map at the entity position.
@@ -631,35 +650,60 @@ class Entity(Actor):
                     self.rect[0],
                     self.rect[1] - self.hardshape[1])
 
+            coords = (
+                    coords[0] + int(shift[0] * zoom),
+                    coords[1] + int(shift[1] * zoom))
+
             real_coords = (
                     int(place[0] * zoom) + coords[0],
                     int(place[1] * zoom) + coords[1])
 
             self._draw_debug(real_coords, zoom, surface, debug_params)
+            atlas = self.entity_skin.atlas
             if self.entity_skin.animation.trails and self.old_pos:
                 for i, (x, y) in enumerate(reversed(self.old_pos)):
                     img = self.entity_skin.animation.trails[
                             len(self.old_pos) - (i + 1)]
 
-                    surface.blit(
-                          loaders.image(
-                              img,
-                              reversed=self.reversed,
-                              zoom=zoom)[0],
-                          (
-                              int(x * zoom) + coords[0] - (
-                                  not self.reversed and self.hardshape[0] or 0),
-                              int(y * zoom) + coords[1] - self.hardshape[1]))
-
-            skin_image = loaders.image(
-                    self.entity_skin.animation.image,
-                    reversed=self.reversed,
-                    lighten=self.lighten,
-                    zoom=zoom)
-
-            surface.blit(
-                    skin_image[0],
-                    real_coords)
+                    trail_coords = (
+                            int(x * zoom) + coords[0] - (
+                                not self.reversed and self.hardshape[0] or 0),
+                            int(y * zoom) + coords[1] - self.hardshape[1])
+
+                    if atlas and img in atlas:
+                        sheet, area = atlas.region(img)
+                        sheet, area = atlas.get(
+                                sheet,
+                                area,
+                                reversed=self.reversed,
+                                zoom=zoom)
+                        surface.blit(sheet, trail_coords, area)
+                    else:
+                        surface.blit(
+                              loaders.image(
+                                  img,
+                                  reversed=self.reversed,
+                                  zoom=zoom)[0],
+                              trail_coords)
+
+            animation = self.entity_skin.animation
+            if atlas and animation.sheet:
+                sheet, area = atlas.get(
+                        animation.sheet,
+                        animation.area,
+                        reversed=self.reversed,
+                        lighten=self.lighten,
+                        zoom=zoom)
+                surface.blit(sheet, real_coords, area)
+
+            else:
+                surface.blit(
+                        loaders.image(
+                            animation.image,
+                            reversed=self.reversed,
+                            lighten=self.lighten,
+                            zoom=zoom)[0],
+                        real_coords)
 
             if self.shield['on']:
                 image = loaders.image(
@@ -678,11 +722,12 @@ class Entity(Actor):
                             - .5 * image[1][3]) * zoom)
                 surface.blit(image[0], shield_coords)
 
-    def update(self, deltatime, gametime, game):
+    def update(self, deltatime, gametime, game, integrate=True):
         """
         Global function to update everything about entity, deltatime is the
         time ellapsed since the precedent frame, gametime is the time since
-        beginning of the game
+        beginning of the game. If integrate is False, the physics are left to
+        the caller (see usf.physics).
         """
 
         self.old_pos = [self.rect[:2], ] + self.old_pos
@@ -692,7 +737,8 @@ class Entity(Actor):
 
         if self.present:
             self.entity_skin.update(gametime, self.reversed, self.upgraded)
-            self._update_physics(deltatime, game)
+            if integrate:
+                self._update_physics(deltatime, game)
 
     def _update_rect(self):
         """
@@ -784,19 +830,32 @@ class Entity(Actor):
         return (game.level.collide_rect(self.point(self.BOTTOM_RIGHT))
                 or game.level.collide_rect(self.point(self.BOTTOM_LEFT)))
 
+    def front_points(self):
+        """
+        the points tested by collide_front: the right ones if the entity is
+        reversed, the left ones otherwise.
+        """
+        if self.reversed:
+            return self.UPPER_RIGHT, self.LOWER_RIGHT
+        return self.LOWER_LEFT, self.UPPER_LEFT
+
+    def back_points(self):
+        """
+        the points tested by collide_back
+        """
+        if self.reversed:
+            return self.UPPER_LEFT, self.LOWER_LEFT
+        return self.UPPER_RIGHT, self.LOWER_RIGHT
+
     def collide_front(self, game):
         """
         if one of the two left points collide and the entity is not
         reversed or one of the two right points collide and the entity is
         reversed and the player is pushed forward.
         """
-
-        return (self.reversed and (
-            game.level.collide_rect(self.point(self.UPPER_RIGHT)) or
-            game.level.collide_rect(self.point(self.LOWER_RIGHT))) or
-            not self.reversed and (
-                game.level.collide_rect(self.point(self.LOWER_LEFT))
-                or game.level.collide_rect(self.point(self.UPPER_LEFT))))
+        return any(
+                game.level.collide_rect(self.point(p))
+                for p in self.front_points())
 
     def collide_back(self, game):
         """
@@ -804,13 +863,35 @@ class Entity(Actor):
         of the two right points collide and the entity is not reversed and the
         player bounce back.
         """
+        return any(
+                game.level.collide_rect(self.point(p))
+                for p in self.back_points())
 
-        return (not self.reversed and (
-            game.level.collide_rect(self.point(self.UPPER_RIGHT)) or
-            game.level.collide_rect(self.point(self.LOWER_RIGHT))) or
-            self.reversed and (
-                game.level.collide_rect(self.point(self.UPPER_LEFT)) or
-                game.level.collide_rect(self.point(self.LOWER_LEFT))))
+    def _push_out(self, game, points, (x, y)):
+        """
+        Move the entity of as few steps of (x, y) (relatively to its
+        direction, like move) as needed so none of the points collide the
+        level, the distance is computed from the rects the points are in, not
+        by testing each step.
+        """
+        if self._reversed:
+            x = -x
+
+        points = [self.point(p) for p in points]
+        steps = 0
+        for i in xrange(self.MAX_PUSH_ITERATIONS):
+            needed = max(
+                    steps + game.level.steps_out(
+                        (px + steps * x, py + steps * y), (x, y))
+                    for px, py in points)
+
+            if needed == steps:
+                break
+            steps = needed
+
+        if self._reversed:
+            x = -x
+        self.move((steps * x, steps * y))
 
     def _world_collide(self, game):
         """
@@ -838,8 +919,7 @@ class Entity(Actor):
                     self.vector[1] * CONFIG.general.BOUNCE)
 
                 self._vector[0] /= 2
-                while self.collide_top(game):
-                    self.move((0, -1))
+                self._push_out(game, (self.TOP_LEFT, self.TOP_RIGHT), (0, -1))
 
             elif self.collide_bottom(game):
                 if self.vector[1] < 0:
@@ -847,24 +927,32 @@ class Entity(Actor):
                             -self.vector[1] * CONFIG.general.BOUNCE)
 
                 self._vector[0] /= 2
-                while self.collide_bottom(game):
-                    self.move((0, 1))
+                self._push_out(
+                        game, (self.BOTTOM_RIGHT, self.BOTTOM_LEFT), (0, 1))
 
             if self.collide_front(game):
                 self._vector[0] = math.fabs(self.vector[0]) / 2
-                while self.collide_front(game):
-                    self.move((2, 0))
+                self._push_out(game, self.front_points(), (2, 0))
 
             elif self.collide_back(game):
                 self._vector[0] = -math.fabs(self.vector[0]) / 2
-                while self.collide_back(game):
-                    self.move((-2, 0))
+                self._push_out(game, self.back_points(), (-2, 0))
 
     def _update_physics(self, deltatime, game):
         """
         This function applies current movemements and various environemental
         vectors to the entity, and calculates collisions.
 
+        """
+        self.integrate(deltatime, *self.physics_forces(deltatime, game))
+        self.collide_world(game)
+
+    def physics_forces(self, deltatime, game):
+        """
+        Move the entity in its walking direction, and return what the level
+        does to it: the movement of the floor it's on, the vector of the
+        blocks it's in, and the friction of the environment.
+
         """
         # Move in walking direction.
         self.move((
@@ -886,6 +974,15 @@ class Entity(Actor):
         environnement_friction = self._get_env_collision(
                 game.level.water_blocs)
 
+        return floor_vector, environnement_vector, environnement_friction
+
+    def integrate(self, deltatime, floor_vector, environnement_vector,
+            environnement_friction):
+        """
+        Apply the forces returned by physics_forces, gravity and air friction
+        to the vector, and the vector to the place of the entity.
+
+        """
         self._vector = [
                 self.vector[0] + environnement_vector[0],
                 self.vector[1] + environnement_vector[1]]
@@ -912,11 +1009,14 @@ class Entity(Actor):
         # apply the vector to entity.
         self.move((self.vector[0] * deltatime, self.vector[1] * deltatime))
 
-        if not self.physics:
-            return
-
-        # Avoid collisions with the map
-        self._world_collide(game)
+    def collide_world(self, game):
+        """
+        Move the rect of the entity to its place, and avoid collisions with
+        the map, if the entity manages them.
+        """
+        self._update_rect()
+        if self.physics:
+            self._world_collide(game)
 
     @property
     def rect(self):
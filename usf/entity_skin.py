@@ -28,6 +28,7 @@ import logging
 from xml.etree import ElementTree
 
 from usf.animations import Frame, PreciseTimedAnimation
+from usf import atlas
 from usf import loaders
 from usf import CONFIG 
 
@@ -43,12 +44,15 @@ class EntitySkin (object):
     """
 
     def __init__(self, dir_name, server=False, xml_from_str=None,
-            keep_xml=False, animation='static'):
+            keep_xml=False, animation='static', use_atlas=False):
         """
         The dir_name is the relative path of the directory where the item/player
         is defined, the class search for an xml file of the same name as the
         directory there.
 
+        With use_atlas, the frames and trails are packed in an atlas, to be
+        drawn from its sheets.
+
         """
         self.animations = {}
         if xml_from_str:
@@ -76,6 +80,7 @@ class EntitySkin (object):
 
         self.filename = dir_name
         self.name = attribs['name']
+        self.server = server
 
         self.image = os.path.join(
                     CONFIG.system_path,
@@ -96,6 +101,10 @@ class EntitySkin (object):
         self.shield_center = self.load_shield_center(attribs)
         self.load_movements(a, dir_name, server)
 
+        self.atlas = None
+        if use_atlas and not server:
+            self.load_atlas(dir_name)
+
         # FIXME: this is about the state of the player, should be in the entity
         # class
         self.current_animation = animation
@@ -186,6 +195,24 @@ class EntitySkin (object):
                     movement.attrib,
                     server)
 
+    def load_atlas(self, dir_name):
+        """ pack all the frames and trails in an atlas, and give each frame
+        its area
+        """
+        images = set()
+        for animation in self.animations.values():
+            for frame in animation.frames:
+                images.add(frame.image)
+                images.update(frame.trails or ())
+
+        self.atlas = atlas.build(dir_name, tuple(sorted(images)))
+
+        for animation in self.animations.values():
+            for frame in animation.frames:
+                frame.sheet, frame.area = self.atlas.region(frame.image)
+            animation.sheet = animation.frames[0].sheet
+            animation.area = animation.frames[0].area
+
     def valid_animation(self, anim_name):
         """ return true if the animation is in the character animations and is
         'static' or not the current animation.
@@ -226,7 +253,7 @@ class EntitySkin (object):
             #logging.debug(self.vectors[anim_name])
             self.add_vectors(anim_name, game, params)
 
-            if self.sounds[anim_name] != []:
+            if self.sounds[anim_name] != [] and not self.server:
                 # XXX reactivate the try/except with the good exception when you
                 # know it
                 #try:
@@ -36,9 +36,15 @@ import logging
 from usf.event_manager import EventManager
 from usf.font import fonts
 from usf.level import Level
+from usf.draw_list import DrawList
 from usf.entity import Entity
+from usf.prefetch import prefetcher
+from usf.spatial import sweep
+from usf.timing import timer
 from usf.translation import _
+from usf import hits
 from usf import loaders
+from usf import physics
 from usf import CONFIG
 GAME_FONT = fonts['sans']['normal']
 
@@ -67,6 +73,9 @@ class Game(object):
         """
         Initialize a game with a list of player and a level,
         level is the basename of the level in levels/
+
+        With screen None, the game runs without display or sound (server, ai,
+        benchmarks): no image is decoded, and draw() must not be called.
         """
 
         self.size = (
@@ -77,16 +86,41 @@ class Game(object):
         self.notif = []
         self.type = 'local'
         self.screen = screen
+        # everything is drawn through it, and sent to the screen at once
+        self.draw_list = DrawList(screen)
 
         self.items = []
         self.events = EventManager()
         self.gametime = 0
 
+        # the game is updated in fixed steps, the time not simulated yet is
+        # kept for the next frame, and the entities are drawn between their
+        # place before and after the last step
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.previous_places = {}
+        self.state = 'game'
+
         # we load the bool for smooth scrolling here, for a better performance
         self.smooth_scrolling = CONFIG.general.SMOOTH_SCROLLING
 
-        self.level = Level(level)
         if screen is not None:
+            # decode everything the match can use before its first frame,
+            # instead of in the middle of a fight
+            prefetcher.add_match(level, players_)
+            prefetcher.finish()
+
+        # without screen, nothing is drawn, only the sizes of the images are
+        # read, and no sound is played
+        self.level = Level(level, server=screen is None)
+        if screen is not None:
+            # the portraits, lives and percents at the bottom of the screen
+            self.hud_top = int(self.size[1] * .9)
+            self.hud = pygame.Surface(
+                    (self.size[0], self.size[1] - self.hud_top),
+                    pygame.locals.SRCALPHA).convert_alpha()
+            self.hud_drawn_state = None
+
             self.zoom = 1
             # loading level
             self.level_place = [0, 0]
@@ -201,10 +235,10 @@ class Game(object):
 
         return e
 
-    def draw_progress_bar_for_lives(self, player):
+    def draw_progress_bar_for_lives(self, player, surface):
         """ heh, draw progress bar for lives of the player
         """
-        self.screen.blit(
+        surface.blit(
                 loaders.image(
                     os.path.join(
                         CONFIG.system_path,
@@ -213,11 +247,11 @@ class Game(object):
                     scale=self.progress_bar_size)[0],
                 (
                 -0.5 * self.icon_space + player.num * self.icon_space,
-                self.progress_bar_x))
+                self.progress_bar_x - self.hud_top))
 
         if (self.progress_bar_size[0] -
                 self.progress_bar_size[0] * (player.percents * 0.1 + 0.01) > 0):
-            self.screen.blit(
+            surface.blit(
                     loaders.image(
                         os.path.join(
                             CONFIG.system_path,
@@ -229,37 +263,37 @@ class Game(object):
                             self.progress_bar_size[1]))[0],
                     (
                     -0.5 * self.icon_space + player.num * self.icon_space,
-                self.progress_bar_x))
+                self.progress_bar_x - self.hud_top))
 
-    def draw_player_portrait(self, player):
+    def draw_player_portrait(self, player, surface):
         """ draw, like... the player portrait? :D
         """
-        self.screen.blit(
+        surface.blit(
                  loaders.image(player.entity_skin.image, scale=(30, 30))[0],
                     (
                     -0.5 * self.icon_space + player.num * self.icon_space,
-                    self.size[1] * .9))
+                    self.size[1] * .9 - self.hud_top))
 
         if loaders.get_gconfig().get("game", "displaylives") == "y":
-            self.screen.blit(
+            surface.blit(
                      GAME_FONT.render(str(player.percents * 10)[:3] + "%",
                      True,
                      pygame.color.Color("red")),
                         (
                         -0.5 * self.icon_space + player.num * self.icon_space,
-                        self.size[1] * .9))
+                        self.size[1] * .9 - self.hud_top))
 
         elif loaders.get_gconfig().get("game",
                 "display_progress_bar_for_lives") == "y":
-            self.draw_progress_bar_for_lives(player)
+            self.draw_progress_bar_for_lives(player, surface)
 
-        self.draw_player_lives(player)
+        self.draw_player_lives(player, surface)
 
-    def draw_player_lives(self, player):
+    def draw_player_lives(self, player, surface):
         """ draw as much hearts as the player has lives on its portrait
         """
         for i in range(player.lives):
-            self.screen.blit(
+            surface.blit(
                     loaders.image(
                         os.path.join(
                             CONFIG.system_path,
@@ -270,12 +304,12 @@ class Game(object):
                             player.num * self.icon_space +
                             32 +
                             i * self.icon_space / 40,
-                        self.size[1] * .9 + 10))
+                        self.size[1] * .9 + 10 - self.hud_top))
 
     def draw_debug_player_coords(self, num, player):
         """ draw player coords, useful for debugging.
         """
-        self.screen.blit(
+        self.draw_list.blit(
                 GAME_FONT.render(
                     str(player.place[0]) +
                     ':' +
@@ -290,7 +324,7 @@ class Game(object):
         """ displays current key sequence of player, useful for debuging
         """
         for i, k in enumerate(controls.player_sequences[num]):
-            self.screen.blit(
+            self.draw_list.blit(
                     loaders.image(
                         os.path.join(
                             CONFIG.system_path,
@@ -307,21 +341,42 @@ class Game(object):
             if debug_params.get('controls', False):
                 self.draw_debug_player_controls(num, debug_params['controls'])
 
+    def hud_state(self):
+        """ return what the HUD depends on, it's only drawn again when this
+        changes
+        """
+        gconfig = loaders.get_gconfig()
+        return (
+                gconfig.get("game", "displaylives"),
+                gconfig.get("game", "display_progress_bar_for_lives"),
+                tuple(
+                    (p.num, p.lives, p.percents, p.entity_skin.image)
+                    for p in self.players))
+
     def draw_portraits(self):
         """
-        Draw players' portraits at bottom of the screen
+        Draw players' portraits at bottom of the screen, they are drawn on
+        the HUD surface, which is only updated when the state of a player
+        changes.
         """
-        #draw the background of the block where the lives are displayed
-        hud_height = 75 * CONFIG.general.WIDTH / 800
-        self.screen.blit(loaders.image(os.path.join(
-            CONFIG.system_path,
-            "misc",
-            "hud.png"),
-            scale=(CONFIG.general.WIDTH, hud_height))[0],
-            (0, CONFIG.general.HEIGHT))
+        state = self.hud_state()
+        if state != self.hud_drawn_state:
+            self.hud_drawn_state = state
+            self.hud.fill(pygame.Color(0, 0, 0, 0))
 
-        for player in self.players:
-            self.draw_player_portrait(player)
+            #draw the background of the block where the lives are displayed
+            hud_height = 75 * CONFIG.general.WIDTH / 800
+            self.hud.blit(loaders.image(os.path.join(
+                CONFIG.system_path,
+                "misc",
+                "hud.png"),
+                scale=(CONFIG.general.WIDTH, hud_height))[0],
+                (0, CONFIG.general.HEIGHT - self.hud_top))
+
+            for player in self.players:
+                self.draw_player_portrait(player, self.hud)
+
+        self.draw_list.blit(self.hud, (0, self.hud_top))
 
     def draw(self, debug_params=dict()):
         """
@@ -329,24 +384,32 @@ class Game(object):
 
         """
         self.center_zoom_camera()
-        self.level.draw_before_players(
-            self.screen, self.level_place, self.zoom,
-            'levelshape' in debug_params and debug_params['levelshape'])
+        with timer('draw level'):
+            self.level.draw_before_players(
+                self.draw_list, self.level_place, self.zoom,
+                'levelshape' in debug_params and debug_params['levelshape'])
+
+        with timer('draw entities'):
+            for e in self.players + self.items:
+                if e.present:
+                    e.draw(self.level_place, self.zoom, self.draw_list,
+                            debug_params=debug_params,
+                            shift=self.interpolation(e))
 
-        for e in self.players + self.items:
-            if e.present:
-                e.draw(self.level_place, self.zoom, self.screen,
-                        debug_params=debug_params)
+        with timer('draw foreground'):
+            self.level.draw_after_players(
+                self.draw_list, self.level_place, self.zoom,
+                'levelmap' in debug_params and debug_params['levelmap'])
 
-        self.level.draw_after_players(
-            self.screen, self.level_place, self.zoom,
-            'levelmap' in debug_params and debug_params['levelmap'])
+        with timer('draw hud'):
+            self.draw_portraits()
+            self.draw_debug(debug_params)
 
-        self.draw_portraits()
-        self.draw_debug(debug_params)
+            self.display_game_state()
+            self.update_notif()
 
-        self.display_game_state()
-        self.update_notif()
+        with timer('blits'):
+            self.draw_list.flush()
 
     def display_game_state(self):
         """
@@ -357,14 +420,14 @@ class Game(object):
         alive_players = filter(Entity.alive, self.players)
 
         if len(alive_players) == 1:
-            self.screen.blit(
+            self.draw_list.blit(
                     loaders.text(
                         alive_players[0].name.capitalize() + _(" WON!"),
                         fonts["bold"][15], 0, 0, 0),
                     (self.size[0] / 2, self.size[1] / 2))
 
         elif len(alive_players) == 0:
-            self.screen.blit(GAME_FONT.render(
+            self.draw_list.blit(GAME_FONT.render(
                 _("OOPS... DRAW!!!"),
                 True,
                 pygame.color.Color("#" +
@@ -377,7 +440,7 @@ class Game(object):
     def draw_notif(self, notif):
         """ draw notifications on the screen
         """
-        self.screen.blit(
+        self.draw_list.blit(
                 GAME_FONT.render(
                     str(notif[1]),
                     True,
@@ -467,17 +530,28 @@ class Game(object):
         engine, but lie here for now.
 
         """
-        # agressive point collision between player entities.
-        for entity in self.players + self.items:
-            for target in self.players + self.items:
-                if target is not entity and not target.invincible:
-                    entity.test_hit(target)
+        # agressive point collision between player entities, they are all
+        # found before the first one changes the state of its target.
+        entities = self.players + self.items
+        for entity, target, point in hits.find(entities):
+            if not target.invincible:
+                target.hit(point, entity.reversed)
 
         # collision between players and items -- tests and consequences
-        for player in filter(lambda x: "pick" in
-            x.entity_skin.current_animation, self.players):
-            for item in self.items:
-                if player.rect.collidelist([item.rect, ]) != -1:
+        pickers = [
+                player for player in self.players
+                if "pick" in player.entity_skin.current_animation]
+        if not pickers:
+            return
+
+        neighbours = sweep([entity.reach for entity in entities])
+        for player, others in zip(self.players, neighbours):
+            if player not in pickers:
+                continue
+
+            for item in [entities[i] for i in others
+                    if i >= len(self.players)]:
+                if player.rect.colliderect(item.rect):
                     item.entity_skin.change_animation(
                             'triger',
                             self,
@@ -486,12 +560,9 @@ class Game(object):
     def update_items(self, deltatime):
         """ trigger update on all the present items
         """
-        for item in self.items:
-            item.update(
-                         deltatime,
-                         self.gametime,
-                         self)
+        physics.update(self.items, deltatime, self.gametime, self)
 
+        for item in self.items:
             if not item.rect.colliderect(self.level.border):
                 item.set_lives(0)
 
@@ -501,12 +572,10 @@ class Game(object):
     def update_players(self, deltatime):
         """ trigger update on all the present players
         """
-        for player in filter(Entity.is_present, self.players):
-            player.update(
-                    deltatime,
-                    self.gametime,
-                    self)
+        players = filter(Entity.is_present, self.players)
+        physics.update(players, deltatime, self.gametime, self)
 
+        for player in players:
             # if the player is out of the level zone
             if not player.rect.colliderect(self.level.border):
                 self.events.add_event(
@@ -583,6 +652,53 @@ class Game(object):
         self.restore_players(backup['players'])
         self.restore_skins(backup['skins'])
 
+    def interpolation(self, entity):
+        """
+        return the offset from the current place of the entity to where it's
+        drawn, between its place before and after the last step.
+        """
+        if entity not in self.previous_places:
+            return 0, 0
+
+        previous = self.previous_places[entity]
+        current = entity.rect
+        shift = (
+                (previous[0] - current[0]) * (1 - self.alpha),
+                (previous[1] - current[1]) * (1 - self.alpha))
+
+        # a move longer than the entity is a teleportation (respawn...)
+        if abs(shift[0]) > current[2] or abs(shift[1]) > current[3]:
+            return 0, 0
+
+        return shift
+
+    def tick(self, frametime):
+        """
+        advance the game of frametime seconds, in steps of 1/TICK_RATE
+        seconds, so the result doesn't depend on the framerate. Return the
+        state, like update.
+
+        If the game is late of more than MAX_CATCHUP_STEPS steps, the rest of
+        the time is dropped: the game slows down instead of freezing.
+        """
+        step = 1.0 / CONFIG.general.TICK_RATE
+        self.accumulator += frametime
+
+        steps = 0
+        while self.accumulator >= step and self.state != 'menu':
+            if steps == CONFIG.general.MAX_CATCHUP_STEPS:
+                self.accumulator %= step
+                break
+
+            self.previous_places = dict(
+                    (e, e.rect[:2]) for e in self.players + self.items)
+            self.state = self.update(step)
+            self.accumulator -= step
+            steps += 1
+
+        self.alpha = self.accumulator / step
+        return self.state
+
     def update(self, deltatime):
         """
         sync everything to current time. Return "game" if we are still in game
@@ -613,11 +729,16 @@ class Game(object):
                             'entity': pl,
                             'gametime': self.gametime})
 
-        self.events.update(deltatime, self.gametime)
-        self.level.update(self.gametime, deltatime)
-        self.update_players(deltatime)
-        self.update_physics()
-        self.update_items(deltatime)
+        with timer('events'):
+            self.events.update(deltatime, self.gametime)
+        with timer('level'):
+            self.level.update(self.gametime, deltatime)
+        with timer('players'):
+            self.update_players(deltatime)
+        with timer('physics'):
+            self.update_physics()
+        with timer('items'):
+            self.update_items(deltatime)
 
         players_left = len(filter(Entity.alive, self.players))
 
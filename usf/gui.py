@@ -30,6 +30,7 @@ from pygame.locals import QUIT
 # Our modules
 from usf.font import fonts
 from usf.game import Game
+from usf.prefetch import prefetcher
 from usf.screens.about import About
 from usf.screens.characters import Characters
 from usf.screens.configure import Configure
@@ -44,7 +45,8 @@ from usf.screens.network_join_screen import NetworkJoinScreen
 from usf.screens.network_game_conf_screen import NetworkGameConfScreen
 from usf.skin import Skin
 from usf.translation import _
-from usf.widgets.widget import optimize_size
+from usf.widgets.widget import optimize_size, invalidate_rect, pop_dirty
+from usf.widgets.widget import invalidate_animated
 from usf import loaders
 from usf import CONFIG
 
@@ -84,18 +86,83 @@ class Gui(object):
         self.state = "menu"
         self.cursor = loaders.image(
                 CONFIG.system_path + os.sep + 'cursor.png')[0]
+        self.cursor_rect = None
+        # the screen drawn at the last frame, and the parts of the display
+        # that changed then (None when the whole display has to be updated)
+        self.drawn_screen = None
+        self.dirty = None
         self.update_youhere()
 
+    def invalidate(self):
+        """
+        Ask for the whole screen to be drawn again at next update.
+        """
+        invalidate_rect(self.screen.get_rect())
+
     def update(self):
         """
         Update the GUI, it draws the mouse, and the menu.
+
+        With DIRTY_RECTS, only the parts of the screen that changed are drawn,
+        and self.dirty is the list of them, to give to pygame.display.update.
         """
+        self.handle_events()
 
-        #draw the background
-        self.skin.get_background()
+        if not CONFIG.display.DIRTY_RECTS:
+            pop_dirty()
+            self.dirty = None
+            self.drawn_screen = None
+            #draw the background
+            self.skin.get_background()
+            self.screens[self.current_screen].update()
+
+            #update the mouse position
+            self.screen.blit(self.cursor, pygame.mouse.get_pos())
+
+        else:
+            self.draw_dirty()
 
-        self.screens[self.current_screen].update()
+        #if we have a game instance and the state is menu...
+        if self.game and self.state != "ingame":
+            self.state = "ingame"
+            return True, self.game
 
+        return False, None
+
+    def draw_dirty(self):
+        """
+        Draw again the parts of the screen that changed since last frame.
+        """
+        screen = self.screens[self.current_screen]
+        if self.current_screen != self.drawn_screen:
+            self.drawn_screen = self.current_screen
+            self.invalidate()
+
+        self.skin.invalidate_layers()
+        invalidate_animated(screen.widget)
+
+        cursor_rect = self.cursor.get_rect(topleft=pygame.mouse.get_pos())
+        if cursor_rect != self.cursor_rect:
+            if self.cursor_rect:
+                invalidate_rect(self.cursor_rect)
+            invalidate_rect(cursor_rect)
+            self.cursor_rect = cursor_rect
+
+        self.dirty = pop_dirty()
+        if not self.dirty:
+            return
+
+        # everything is drawn, but only the changed parts reach the display
+        self.screen.set_clip(self.dirty[0].unionall(self.dirty[1:]))
+        self.skin.get_background()
+        screen.update()
+        self.screen.blit(self.cursor, cursor_rect)
+        self.screen.set_clip(None)
+
+    def handle_events(self):
+        """
+        Send the events to the widgets of the current screen.
+        """
         while(True):
             event = pygame.event.poll()
             if event.type == pygame.QUIT:
@@ -112,19 +179,6 @@ class Gui(object):
 
             else:
                 break
-        #draw the '> you are here :' dialog
-        #update the mouse position
-        x, y = pygame.mouse.get_pos()
-        #x += self.cursor.get_height()
-        #y += self.cursor.get_width()
-        self.screen.blit(self.cursor, (x, y))
-
-        #if we have a game instance and the state is menu...
-        if self.game and self.state != "ingame":
-            self.state = "ingame"
-            return True, self.game
-
-        return False, None
 
     def handle_mouse(self, event):
         """
@@ -356,9 +410,13 @@ class Gui(object):
                 players.append(file_name)
 
         if len(players) > 1:
+            level = self.screens["level"].get_level()
+            prefetcher.add_match(level, players)
+            self.loading()
+
             game = Game(
                 self.screen,
-                self.screens["level"].get_level(),
+                level,
                 players)
 
             #thread.start_new_thread(self.loading, ())
@@ -366,6 +424,29 @@ class Gui(object):
             #self.state="game"
             return game
 
+    def loading(self):
+        """
+        Convert the files asked to the prefetcher, showing how many are ready,
+        a gui frame at a time.
+        """
+        budget = 1000 / CONFIG.general.MAX_GUI_FPS
+        while prefetcher.update(budget):
+            text = loaders.paragraph(
+                    _("Loading...") + ' %d%%' % (prefetcher.progress() * 100),
+                    fonts['mono']['normal'])
+
+            self.screen.fill(pygame.color.Color("black"))
+            self.screen.blit(
+                    text,
+                    (self.screen.get_width() / 2 - text.get_width() / 2,
+                     self.screen.get_height() / 2 - text.get_height() / 2))
+            pygame.display.update()
+
+            # let the workers decode the next files
+            pygame.time.wait(10)
+
+        self.invalidate()
+
 
 def get_text_transparent(name):
     text = loaders.text(name, fonts['mono']['15']).convert()
@@ -0,0 +1,123 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+Find the hits of the aggressive points of the entities on the other entities
+of the game, all at once, before any of them is applied:
+
+    for entity, target, point in hits.find(self.players + self.items):
+        if not target.invincible:
+            target.hit(point, entity.reversed)
+
+The hits are returned in the order the entities and their points are in, the
+one Entity.test_hit would give testing each entity against each other one.
+
+With numpy, every point is tested against every entity in one pass over
+arrays, otherwise only the entities whose reach overlap are tested. In both
+cases, an entity with an empty rect can't be hit (pygame 1.9 colliderect
+would find it in a point inside its border).
+'''
+
+from usf.spatial import sweep
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# the size of the box around an aggressive point
+SIZE = 6
+
+
+def find(entities):
+    """ return the (entity, target, point) of the aggressive points of
+    entities colliding another one
+    """
+    if numpy is not None:
+        return _find_numpy(entities)
+    return _find_python(entities)
+
+
+def _find_python(entities):
+    result = []
+    neighbours = sweep([entity.reach for entity in entities])
+    for entity, others in zip(entities, neighbours):
+        rect = entity.rect
+        for target in [entities[i] for i in others]:
+            target_rect = target.rect
+            if target_rect.width <= 0 or target_rect.height <= 0:
+                continue
+
+            for point in entity.agressiv_points:
+                if target_rect.colliderect(
+                        rect[0] + point[0][0] - SIZE / 2,
+                        rect[1] + point[0][1] - SIZE / 2,
+                        SIZE,
+                        SIZE):
+                    result.append((entity, target, point))
+
+    return result
+
+
+def _find_numpy(entities):
+    rects = [entity.rect for entity in entities]
+
+    # one line per aggressive point: its box, its entity and its index in
+    # the points of the entity
+    points = []
+    boxes = []
+    for i, (entity, rect) in enumerate(zip(entities, rects)):
+        for j, point in enumerate(entity.agressiv_points):
+            points.append(point)
+            boxes.append((
+                rect[0] + point[0][0] - SIZE / 2,
+                rect[1] + point[0][1] - SIZE / 2,
+                i,
+                j))
+
+    if not boxes:
+        return []
+
+    boxes = numpy.array(boxes, dtype=int)
+    targets = numpy.array([tuple(rect) for rect in rects], dtype=int)
+
+    x, y, owner = boxes[:, 0:1], boxes[:, 1:2], boxes[:, 2:3]
+    left, top = targets[:, 0], targets[:, 1]
+    width, height = targets[:, 2], targets[:, 3]
+
+    # the same test as Rect.colliderect, for each point (line) and target
+    # (column), an empty rect collides nothing
+    hit = ((x < left + width) & (left < x + SIZE)
+            & (y < top + height) & (top < y + SIZE)
+            & (width > 0) & (height > 0)
+            & (owner != numpy.arange(len(entities))))
+
+    point_index, target_index = numpy.nonzero(hit)
+
+    # by entity, then target, then point of the entity
+    order = numpy.lexsort((
+        boxes[point_index, 3],
+        target_index,
+        boxes[point_index, 2]))
+
+    return [
+            (entities[boxes[point_index[k], 2]],
+                entities[target_index[k]],
+                points[point_index[k]])
+            for k in order]
@@ -0,0 +1,123 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+The sizes of the images of a directory (a character, an item, a level...),
+kept in an index file next to them, so the code that only needs the sizes
+(server, ai, tools) doesn't even open the images.
+
+Each line of the index is:
+
+    filename<tab>width<tab>height<tab>size of the file
+
+An entry is ignored if the size of the file changed, the size is then read
+from the png header. The indexes are built by utils/build_image_index.py.
+'''
+
+import logging
+import os
+import struct
+
+from usf.memoize import memoize
+
+INDEX_NAME = 'sizes.idx'
+PNG_SIGNATURE = '\x89PNG\r\n\x1a\n'
+
+
+def png_size(name):
+    """ return the (width, height) of a png file, read from its header, or
+    None if it's not a png
+    """
+    try:
+        f = open(name, 'rb')
+        try:
+            header = f.read(24)
+        finally:
+            f.close()
+    except IOError:
+        return None
+
+    if header[:8] == PNG_SIGNATURE and header[12:16] == 'IHDR':
+        return struct.unpack('>II', header[16:24])
+    return None
+
+
+@memoize
+def load(directory):
+    """ return the entries of the index of a directory, as a dict of
+    filename: (width, height, size of the file), empty if there is no index
+    """
+    entries = {}
+    try:
+        f = open(os.path.join(directory, INDEX_NAME))
+    except IOError:
+        return entries
+
+    try:
+        for line in f:
+            try:
+                filename, width, height, filesize = line.rstrip('\n').split(
+                        '\t')
+                entries[filename] = (int(width), int(height), int(filesize))
+            except ValueError:
+                logging.warning(
+                        'bad line in the index of ' + directory + ': ' + line)
+    finally:
+        f.close()
+
+    return entries
+
+
+def size(name):
+    """ return the (width, height) of an image, from the index of its
+    directory or from its header, or None if neither knows it
+    """
+    directory, filename = os.path.split(name)
+    entry = load(directory).get(filename)
+    if entry is not None:
+        try:
+            if os.path.getsize(name) == entry[2]:
+                return entry[:2]
+        except OSError:
+            pass
+        logging.debug('outdated index entry for ' + name)
+
+    return png_size(name)
+
+
+def build(directory):
+    """ write the index of the png files of a directory, return the number of
+    files in it.
+    """
+    lines = []
+    for filename in sorted(os.listdir(directory)):
+        name = os.path.join(directory, filename)
+        dimensions = png_size(name)
+        if dimensions is not None:
+            lines.append('%s\t%d\t%d\t%d\n' % (
+                (filename,) + tuple(dimensions) + (os.path.getsize(name),)))
+
+    if lines:
+        f = open(os.path.join(directory, INDEX_NAME), 'w')
+        try:
+            f.writelines(lines)
+        finally:
+            f.close()
+
+    return len(lines)
@@ -36,9 +36,14 @@ from usf.debug_utils import draw_rect
 from usf.memoize import memoize
 from usf.particles import ParticlesGenerator
 from usf.script import secure_eval
+from usf.spatial import SpatialHash
 from usf import loaders
+from usf.rescale import rescaler
 from usf import CONFIG
 
+# the size of the tiles the level images are split into
+TILE_SIZE = 256
+
 
 class Decorum(object):
     """
@@ -102,49 +107,29 @@ class Block (object):
         Not much to do here.
         """
         self.position = position
-        try:
-            self.texture = os.path.join(
-                    CONFIG.system_path,
-                    "levels",
-                    levelname,
-                    texture)
-            loaders.image(self.texture)
-        except pygame.error:
-            logging.debug("No texture found here: " + self.texture)
-            try:
-                self.texture = os.path.join(
-                        CONFIG.system_path,
-                        "levels",
-                        "common",
-                        texture)
-
-            except pygame.error:
-                logging.error("Can't load the texture: " + texture)
-
+        self.texture = self.find_texture(levelname, texture)
         if texture_fg:
-            try:
-                self.texture_fg = os.path.join(
-                        CONFIG.system_path,
-                        "levels",
-                        levelname,
-                        texture_fg)
-                loaders.image(self.texture_fg)
-            except pygame.error:
-                logging.debug("No texture found here: " + self.texture_fg)
-                try:
-                    self.texture = os.path.join(
-                            CONFIG.system_path,
-                            "levels",
-                            "common",
-                            texture_fg)
-
-                except pygame.error:
-                    logging.error("Can't load the texture: " + texture_fg)
+            self.texture_fg = self.find_texture(levelname, texture_fg)
         else:
             self.texture_fg = None
 
         self.collide_rects = []
 
+    def find_texture(self, levelname, texture):
+        """
+        Return the path of a texture, in the level directory, or in the common
+        one. The image is not loaded, it will be when drawn.
+        """
+        path = os.path.join(CONFIG.system_path, "levels", levelname, texture)
+        if os.path.exists(path):
+            return path
+
+        logging.debug("No texture found here: " + path)
+        path = os.path.join(CONFIG.system_path, "levels", "common", texture)
+        if not os.path.exists(path):
+            logging.error("Can't load the texture: " + texture)
+        return path
+
     def draw(self, surface, coords=(0, 0), zoom=1):
         """
         Draw this moving bloc on the passed surface, taking account of zoom and
@@ -260,7 +245,11 @@ class MovingPart(Block):
 
         # get the proportion of travel between last and next we should have
         # done.
-        percent_bettween = (
+        # on a pattern time, last and next are the same place.
+        if next_place['time'] == last['time']:
+            percent_bettween = 0
+        else:
+            percent_bettween = (
                 level_time * 10000 % self.patterns[-1]['time'] - last['time']) / (
                         next_place['time'] - last['time'])
 
@@ -294,6 +283,49 @@ class MovingPart(Block):
         self.old_position, self.position = backup
 
 
+@memoize
+def tiles(name):
+    '''
+    return the crop parameters (width, height, x, y) of the tiles an image is
+    split into to be drawn, tiles are TILE_SIZE pixels wide, except on the
+    right and bottom borders.
+    '''
+    width, height = loaders.image(name)[1][2:]
+    return [
+            (min(TILE_SIZE, width - x), min(TILE_SIZE, height - y), x, y)
+            for y in xrange(0, height, TILE_SIZE)
+            for x in xrange(0, width, TILE_SIZE)]
+
+
+@memoize
+def filled_mask(size):
+    '''
+    return a mask of size with every bit set, to test a rect against a mask
+    '''
+    mask = pygame.mask.Mask(size)
+    mask.fill()
+    return mask
+
+
+def rasterize(rects):
+    '''
+    return a mask with the bits of the pixels covered by the rects set, and the
+    position of its top left corner, or (None, None) if there are no rects.
+    '''
+    if not rects:
+        return None, None
+
+    bounds = rects[0].unionall(rects[1:])
+    mask = pygame.mask.Mask(bounds.size)
+    for rect in rects:
+        if rect[2] > 0 and rect[3] > 0:
+            mask.draw(
+                    filled_mask(rect.size),
+                    (rect[0] - bounds[0], rect[1] - bounds[1]))
+
+    return mask, bounds.topleft
+
+
 def get_xml(levelname):
     '''
     return xml tree of the level
@@ -345,7 +377,8 @@ class Level(object):
         self.load_images(attribs, levelname)
         self.load_borders(attribs)
         self.load_entrypoints(xml)
-        self.load_layers(xml)
+        if not server:
+            self.load_layers(xml)
         self.load_blocs(xml)
         self.load_moving_blocs(xml, server, levelname)
         self.load_particle_generators(xml)
@@ -353,6 +386,28 @@ class Level(object):
         self.load_vector_blocs(xml, server, levelname)
         self.load_decorums(xml)
         self.load_events(levelname, xml)
+        self.build_index()
+
+    def build_index(self):
+        ''' index the rects of the level for collision tests: the map is
+        drawn in a mask, where testing a point is reading a bit, the vector
+        blocs never move, the moving blocs are updated in their own index when
+        they move.
+        '''
+        self.map_mask, self.map_origin = rasterize(self.map)
+
+        # the rects of the map are still needed to know how far a point is
+        # from their borders
+        self.map_index = SpatialHash()
+        self.map_index.set(self, self.map)
+
+        self.static_index = SpatialHash()
+        for block in self.vector_blocs:
+            self.static_index.set(block, block.collide_rects)
+
+        self.moving_index = SpatialHash()
+        for block in self.moving_blocs:
+            self.moving_index.set(block, block.collide_rects)
 
     def load_events(self, name, xml):
         for event in xml.findall('event'):
@@ -418,8 +473,7 @@ class Level(object):
         ''' calculate actual size of the level, with level image size and
         borders
         '''
-        #FIXME: should not depend on the initialisation of pygame
-        self.rect = loaders.image(self.level)[1]
+        self.rect = loaders.image_rect(self.level)
 
         if 'margins' in attribs:
             margins = [int(i) for i in attribs['margins'].split(',')]
@@ -636,16 +690,35 @@ class Level(object):
     def draw_level(self, surface, coords, zoom, shapes=False):
         ''' draw the center part of the level
         '''
-        surface.blit(loaders.image(self.level, zoom=zoom)[0], coords)
+        self.draw_tiles(surface, self.level, coords, zoom)
         if shapes:
             self.draw_debug_map(surface, coords, zoom)
 
+    def draw_tiles(self, surface, name, coords, zoom):
+        ''' draw the visible tiles of an image, only those are scaled to the
+        zoom, each tile is scaled to end where the next one begins, so there is
+        no gap between them.
+        '''
+        clip = surface.get_clip()
+        for w, h, x, y in tiles(name):
+            left = int(x * zoom)
+            top = int(y * zoom)
+            rect = pygame.Rect(
+                    int(coords[0]) + left,
+                    int(coords[1]) + top,
+                    int((x + w) * zoom) - left,
+                    int((y + h) * zoom) - top)
+
+            if rect.colliderect(clip):
+                surface.blit(
+                        rescaler.image(name, rect.size, crop=(w, h, x, y))[0],
+                        rect)
+
     def draw_foreground(self, surface, coords, zoom):
         ''' draw the decorations of the level that are before the player
         '''
         if self.foreground:
-            surface.blit(
-                    loaders.image(self.foreground, zoom=zoom)[0], coords)
+            self.draw_tiles(surface, self.foreground, coords, zoom)
 
         for d in self.decorums:
             if d.depth >= 0:
@@ -668,6 +741,7 @@ class Level(object):
         '''
         for block in self.moving_blocs:
             block.update(time)
+            self.moving_index.set(block, block.collide_rects)
 
         for decorum in self.decorums:
             decorum.update(time)
@@ -679,16 +753,66 @@ class Level(object):
         """
         This fonction returns True if the rect at coords (x, y) collides one of
         the rects of the level, including the moving blocks and vector blocks.
-
-        #XXX: any decent optimisation of this welcomed
+        Only the rects in the cells of the indexes near the point are tested.
         """
         r = pygame.Rect((x, y), (h, w))
+        return (self.collide_map(r)
+                or self.static_index.collide(r)
+                or self.moving_index.collide(r))
 
-        if r.collidelist(self.map) != -1:
-            return True
+    def colliding_rects(self, rect):
+        """
+        Return the rects of the level (map, vector and moving blocks) colliding
+        rect.
+        """
+        return (self.map_index.colliding(rect)
+                + self.static_index.colliding(rect)
+                + self.moving_index.colliding(rect))
 
-        else:
-            for i in self.vector_blocs + self.moving_blocs:
-                if r.collidelist(i.collide_rects) != -1:
-                    return True
+    def steps_out(self, (x, y), (dx, dy), max_iterations=8):
+        """
+        Return the number of steps of (dx, dy) (one of them being 0) to move
+        the point at (x, y) out of the level, it's computed from the borders
+        of the rects the point is in, and of the ones it goes through, giving
+        up after max_iterations of them.
+        """
+        steps = 0
+        for i in xrange(max_iterations):
+            point = pygame.Rect(x + steps * dx, y + steps * dy, 1, 1)
+            rects = self.colliding_rects(point)
+            if not rects:
+                break
+
+            step = abs(dx or dy)
+            needed = steps
+            for rect in rects:
+                if dx > 0:
+                    distance = rect.right - point[0]
+                elif dx < 0:
+                    distance = point[0] - rect.left + 1
+                elif dy > 0:
+                    distance = rect.bottom - point[1]
+                else:
+                    distance = point[1] - rect.top + 1
+
+                # round up to a whole number of steps
+                needed = max(needed, steps + (distance + step - 1) // step)
+            steps = needed
+
+        return steps
+
+    def collide_map(self, rect):
+        """
+        Return True if the rect collides the static map, using its mask.
+        """
+        if self.map_mask is None or rect[2] <= 0 or rect[3] <= 0:
             return False
+
+        x = rect[0] - self.map_origin[0]
+        y = rect[1] - self.map_origin[1]
+        if rect[2] == rect[3] == 1:
+            width, height = self.map_mask.get_size()
+            return (0 <= x < width and 0 <= y < height
+                    and bool(self.map_mask.get_at((x, y))))
+
+        return self.map_mask.overlap(filled_mask(rect.size), (x, y)) is not None
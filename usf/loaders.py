@@ -68,7 +68,9 @@ import logging
 import math
 from ConfigParser import SafeConfigParser
 
-from usf.memoize import memoize
+from usf.memoize import memoize, memoize_with, SizedCache
+from usf import disk_cache
+from usf import image_index
 from usf import CONFIG
 
 try:
@@ -92,26 +94,46 @@ def _zoom(name, kwargs):
     """ takes care of the zoom argument, and pass the rest to image()
     zoom is used as a multiplication in size on both dimension of the image.
     return the end result.
+
+    The image is scaled from the smallest halved version (see _mip) that is
+    still bigger than the result, not from the full size one.
     """
     zoom = kwargs['zoom']
     kwargs['zoom'] = None
+    size = (
+            int(image(name, **kwargs)[1][2]*zoom),
+            int(image(name, **kwargs)[1][3]*zoom))
+
+    level = 0
+    while zoom <= .5:
+        zoom *= 2
+        level += 1
+    kwargs['mip'] = level
+
     #logging.debug('scaling image '+name+' :'+str(zoom))
     if CONFIG.general.SMOOTHSCALE:
-        img = pygame.transform.smoothscale(
-                image(name, **kwargs)[0],
-                (
-                 int(image(name, **kwargs)[1][2]*zoom),
-                 int(image(name, **kwargs)[1][3]*zoom)))
+        img = pygame.transform.smoothscale(image(name, **kwargs)[0], size)
     else:
-        img = pygame.transform.scale(
-                image(name, **kwargs)[0],
-                (
-                 int(image(name, **kwargs)[1][2]*zoom),
-                 int(image(name, **kwargs)[1][3]*zoom)))
+        img = pygame.transform.scale(image(name, **kwargs)[0], size)
 
     return img
 
 
+def _mip(name, kwargs):
+    """ return the image halved mip times, each level is computed from the
+    previous one, so they are all kept in cache for the next zooms.
+    """
+    level = kwargs['mip']
+    kwargs['mip'] = level - 1
+    img = image(name, **kwargs)[0]
+    size = (max(1, img.get_width() / 2), max(1, img.get_height() / 2))
+
+    if CONFIG.general.SMOOTHSCALE:
+        return pygame.transform.smoothscale(img, size)
+    else:
+        return pygame.transform.scale(img, size)
+
+
 def _expand(name, kwargs):
     """
     This feature can be used for buttons, which have a rounded border. But
@@ -280,16 +302,47 @@ def _alpha(name, kwargs):
     return img
 
 
-def _load(name):
-    """ Load an image and convert it for faster blit operations, always
-    consider the image to have an alpha channel.
+# images and sounds already decoded by the prefetch workers, waiting for
+# _load() or track() to take them, this is only modified in the main thread.
+DECODED = {}
+
+# surfaces built by the game, like atlas sheets, which image() can transform
+# as if they were files
+SURFACES = {}
+
+
+def decode(name):
+    """ return the image in the file name, not converted, so it can be used
+    outside of the main thread. With DISK_CACHE, the decoded pixels are kept
+    on disk for the next launches.
     """
+    if CONFIG.general.DISK_CACHE:
+        img = disk_cache.load(name)
+        if img is not None:
+            return img
+
     try:
         img = pygame.image.load(name)
     except pygame.error:
         logging.debug('Cannot load image:'+str(name), 2)
         raise
-    return img.convert_alpha()
+
+    if CONFIG.general.DISK_CACHE:
+        disk_cache.store(name, img)
+    return img
+
+
+def _load(name):
+    """ Load an image and convert it for faster blit operations, always
+    consider the image to have an alpha channel.
+    """
+    if name in SURFACES:
+        return SURFACES[name]
+
+    if name in DECODED:
+        return DECODED.pop(name).convert_alpha()
+
+    return decode(name).convert_alpha()
 
 
 def _reverse(name, kwargs):
@@ -311,7 +364,77 @@ def _rotate(name, kwargs):
             image(name, **kwargs)[0], angle * 180/math.pi)
 
 
-@memoize
+def _image_size(value):
+    """ return the number of bytes used by the pixels of a cached image
+    """
+    img = value[0]
+    return img.get_width() * img.get_height() * img.get_bytesize()
+
+
+def _image_tier(params):
+    """ images produced by a transformation (zoom, alpha...) are in the first
+    tier, so they are evicted before the images directly loaded from disk.
+
+    The params are canonical, a transformation that doesn't change the image
+    is not in them, so any of them makes a transformed image, even with a
+    false value (alpha=0.0).
+    """
+    for param in params[1:]:
+        if param[0] in TRANSFORMS:
+            return 0
+    return 1
+
+
+# the order in which transformations are applied, each one works on the result
+# of the ones before it, so a flipped zoomed image reuses the zoomed one.
+TRANSFORMS = ('crop', 'expand', 'scale', 'mip', 'zoom', 'reversed', 'rotate',
+        'lighten', 'alpha')
+
+# the budget is configured in megabytes
+IMAGE_CACHE = SizedCache(
+        CONFIG.general.IMAGE_CACHE_SIZE * 1024 * 1024,
+        _image_size,
+        _image_tier,
+        tiers=2)
+
+
+def _canonical(kwargs):
+    """ return the transformations asked in kwargs, without the ones that
+    wouldn't change the image, and with values of a fixed type, so equivalent
+    calls share the same cache entry.
+    """
+    params = {}
+    for kw in TRANSFORMS:
+        value = kwargs.get(kw)
+        if kw == 'alpha':
+            # alpha=0 is a valid (invisible) value
+            if value is None or value >= 1:
+                continue
+            value = float(value)
+
+        elif not value:
+            continue
+
+        elif kw in ('reversed', 'lighten'):
+            value = True
+
+        elif kw in ('crop', 'expand', 'scale'):
+            value = tuple(int(x) for x in value)
+
+        elif kw == 'mip':
+            value = int(value)
+            if value < 1:
+                continue
+
+        else:
+            value = float(value)
+            if kw == 'zoom' and value == 1:
+                continue
+
+        params[kw] = value
+    return params
+
+
 def image(name, *args, **kwargs):
     """
     A function to load an image, memoized, and with manipulation capabilities:
@@ -321,6 +444,47 @@ def image(name, *args, **kwargs):
         change alpha of an image,
         crop
         and extand an image.
+
+    Transformations are applied in the order of TRANSFORMS, whatever the order
+    of the arguments.
+
+    Results are kept in IMAGE_CACHE, up to IMAGE_CACHE_SIZE megabytes, its
+    size attribute gives the current number of bytes used.
+    """
+    return _image(name, **_canonical(kwargs))
+
+
+def _key(name, kwargs):
+    """ return the key of image(name, **kwargs) in IMAGE_CACHE
+    """
+    return (name,) + tuple(sorted(_canonical(kwargs).items()))
+
+
+def cached(name, **kwargs):
+    """ return True if image(name, **kwargs) is in the cache
+    """
+    return _key(name, kwargs) in IMAGE_CACHE
+
+
+def forget(name, **kwargs):
+    """ remove image(name, **kwargs) from the cache, if it's there
+    """
+    key = _key(name, kwargs)
+    if key in IMAGE_CACHE:
+        del IMAGE_CACHE[key]
+
+
+def store(img, name, **kwargs):
+    """ put an image computed elsewhere in the cache, as the result of
+    image(name, **kwargs)
+    """
+    IMAGE_CACHE[_key(name, kwargs)] = (img, img.get_rect())
+
+
+@memoize_with(IMAGE_CACHE)
+def _image(name, **kwargs):
+    """ apply the last transformation of kwargs to the image produced by the
+    others, or load the image if there is none.
     """
     keywords = {
             'reversed': _reverse,
@@ -329,12 +493,13 @@ def image(name, *args, **kwargs):
             'scale': _scale,
             'crop': _crop,
             'expand': _expand,
+            'mip': _mip,
             'zoom': _zoom,
             'rotate': _rotate,
             }
 
-    for kw in keywords:
-        if kw in kwargs and kwargs[kw]:
+    for kw in reversed(TRANSFORMS):
+        if kw in kwargs:
             img = keywords[kw](name, kwargs)
             break
     else:
@@ -343,6 +508,21 @@ def image(name, *args, **kwargs):
     return img, img.get_rect()
 
 
+@memoize
+def image_rect(name):
+    """ return the rect of image(name), for a png file, it's read from the
+    index of its directory or from its header, without decoding the pixels,
+    so a game without display (server, ai, benchmarks) can know the size of
+    the images it never draws.
+    """
+    if name not in SURFACES:
+        size = image_index.size(name)
+        if size is not None:
+            return pygame.Rect((0, 0), size)
+
+    return image(name)[1]
+
+
 @memoize
 def image_layer(first, second, pos=(0, 0)):
     """ return a copy of the first image, with the second one blitted on it
@@ -394,6 +574,8 @@ def track(name):
     try:
         freq, bitsize, channels, buff = (44100, -16, 2, 1024)
         pygame.mixer.init(freq, bitsize, channels, buff)
+        if name in DECODED:
+            return DECODED.pop(name)
         return pygame.mixer.Sound(name)
     except (pygame.error):
         # no sound
@@ -41,11 +41,15 @@ from usf.controls import Controls
 from usf.music import Music
 from usf.font import fonts
 from usf.ai import AI
+from usf.prefetch import prefetcher
+from usf.timing import timer
+from usf.widgets.widget import invalidate_rect
 
 from usf.translation import _
 
 
 from usf import loaders
+from usf import memoize
 from usf import CONFIG
 
 logging.basicConfig(
@@ -94,6 +98,8 @@ class Main(object):
         self.lock = threading.Lock()
         self.stop_thread = False
         self.text_thread = _("Loading...")
+        # where the fps and cache counters were drawn
+        self.stats_rect = None
 
         self.level = level
         if players is None:
@@ -191,6 +197,9 @@ class Main(object):
         # instance to switch to.
         start_loop = pygame.time.get_ticks()
         menu_was = self.menu.current_screen
+        if self.stats_rect:
+            # the counters are drawn over the menu, and change at each frame
+            invalidate_rect(self.stats_rect)
         newgame, game_ = self.menu.update()
         if menu_was == 'keyboard' and self.menu.current_screen != 'keyboard':
             self.controls.load_keys()
@@ -227,8 +236,9 @@ class Main(object):
 	    to the screen
         """
         #d = self.game.update_clock(was_paused or self.game.first_frame)
-        self.state = self.game.update(dt)
-        self.manage_ai()
+        self.state = self.game.tick(dt)
+        with timer('ai'):
+            self.manage_ai()
 
         if self.state in ('game', 'victory'):
             self.game.draw(
@@ -244,18 +254,41 @@ class Main(object):
             self.menu.load = False
         else:
             self.menu.current_screen = "main_screen"
+            memoize.log_stats()
+            if timer.enabled:
+                timer.dump_match(self.game.level.levelname)
 
         self.music_state = self.state
 
     def display_fps(self):
         """ FPS counter
         """
+        rects = []
         if CONFIG.display.SHOW_FPS:
-            self.screen.blit(
+            rects.append(self.screen.blit(
                     loaders.text(
                         "FPS: " + str(self.clock.get_fps()),
                         fonts["mono"]["38"]),
-                    (10, 5))
+                    (10, 5)))
+
+        if CONFIG.display.SHOW_CACHE_STATS:
+            rects.extend(self.display_cache_stats())
+
+        self.stats_rect = rects and rects[0].unionall(rects[1:]) or None
+
+    def display_cache_stats(self):
+        """ display the counters of the memoized functions under the FPS
+        counter, these texts change every frame, so they are not memoized.
+        """
+        font = fonts["mono"]["38"]
+        return [
+                self.screen.blit(
+                    font.render(
+                        str(stats).replace('usf.', '', 1),
+                        True,
+                        pygame.color.Color('white')),
+                    (10, 5 + (i + 1) * font.get_linesize()))
+                for i, stats in enumerate(memoize.stats())]
 
     def run(self):
         """
@@ -278,10 +311,14 @@ class Main(object):
                 dt = self.clock.tick(CONFIG.general.MAX_GUI_FPS) / 1000.0
 
             if self.state != "menu":
-                self.state = self.controls.poll( self.game, self.menu)
+                with timer('controls'):
+                    self.state = self.controls.poll( self.game, self.menu)
 
             # this depends on the previous assertion, it's NOT an elif
             if self.state == "menu":
+                if state_was != "menu":
+                    # the game was drawn over the menu
+                    self.menu.invalidate()
                 self.manage_menu()
 
             else:
@@ -291,11 +328,25 @@ class Main(object):
 
                 self.manage_game(dt)
 
+            # convert the images decoded in background since last frame
+            prefetcher.update()
+
             self.display_fps()
-            pygame.display.update()
+            if self.state == "menu" and self.menu.dirty is not None:
+                if self.stats_rect:
+                    self.menu.dirty.append(self.stats_rect)
+                pygame.display.update(self.menu.dirty)
+            else:
+                if timer.enabled and self.state != "menu":
+                    timer.draw(self.screen)
+                with timer('display'):
+                    pygame.display.update()
 
             if CONFIG.audio.MUSIC:
-                self.music.update(self.music_state)
+                with timer('music'):
+                    self.music.update(self.music_state)
+
+            timer.end_frame()
 
             # verify there is not a QUIT event waiting for us, in case of we
             # have to quit.
@@ -311,7 +362,10 @@ class Main(object):
         """
         while not self.stop_thread:
             self.lock.acquire()
-            text = loaders.paragraph(self.text_thread, fonts['mono']['normal'])
+            text = self.text_thread
+            if prefetcher.busy:
+                text += ' %d%%' % (prefetcher.progress() * 100)
+            text = loaders.paragraph(text, fonts['mono']['normal'])
             self.lock.release()
 
             x = self.screen.get_width()/2 - text.get_width()/2
@@ -45,32 +45,210 @@ of course, if params/results are memory huger, or the function is called with
 lot of different params, that will eat some memory, but if you often need the
 same result, that can bring you a lot of speed.
 
+Every memoized function counts its hits and misses, stats() return these
+counters for all of them, to check the caches are really useful.
+
 '''
 
 # the wraps decorator allow us to define well behaved decorator, that keep the
 # name, doc and other important things of decorated functions
 from functools import wraps
+from collections import OrderedDict
+import logging
+import sys
+import time
+
+# statistics of every memoized function, see stats()
+_STATS = []
+
+
+def estimate_size(value):
+    """ return an estimation of the memory used by a cached value, in bytes
+    """
+    if hasattr(value, 'get_bytesize'):
+        # pygame surfaces, only count pixels
+        return value.get_width() * value.get_height() * value.get_bytesize()
+
+    elif hasattr(value, 'get_num_channels'):
+        # pygame sounds, the mixer is initialised in 44100Hz, 16 bits, stereo
+        # by loaders.track
+        return int(value.get_length() * 44100 * 2 * 2)
+
+    elif isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+
+    return sys.getsizeof(value)
+
+
+class CacheStats(object):
+    """
+    Counters about the use of the cache of a memoized function: number of
+    calls, hits and misses, and time spent computing missed results (this time
+    includes the time spent in other memoized functions called meanwhile).
+    """
+
+    def __init__(self, name, cache):
+        self.name = name
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self.miss_time = 0.0
+
+    @property
+    def calls(self):
+        """ number of calls to the memoized function
+        """
+        return self.hits + self.misses
+
+    @property
+    def entries(self):
+        """ number of results currently in the cache
+        """
+        return len(self.cache)
+
+    @property
+    def size(self):
+        """ estimated memory used by the cached results, in bytes
+        """
+        if hasattr(self.cache, 'size'):
+            return self.cache.size
+
+        return sum(estimate_size(v) for v in self.cache.values())
+
+    def __str__(self):
+        return '%s: %d calls, %d%% hits, %d entries, %.1fMB, %.2fs in misses' % (
+                self.name,
+                self.calls,
+                self.calls and 100 * self.hits / self.calls,
+                self.entries,
+                self.size / 1048576.0,
+                self.miss_time)
+
+
+def stats():
+    """ return the statistics of all the memoized functions, sorted by name
+    """
+    return sorted(_STATS, key=lambda s: s.name)
+
+
+def log_stats():
+    """ write the statistics of all the memoized functions in the log
+    """
+    for s in stats():
+        logging.info(str(s))
+
 
-def memoize(function):
+class SizedCache(object):
+    """
+    A dict-like cache, bounded by the total size of its values instead of
+    their number. When adding a value would get the cache over its budget, the
+    least recently used values are evicted first, and every value of a lower
+    tier is evicted before any value of an higher tier.
+
+    sizeof is a function returning the size of a value, tier a function
+    returning the tier of a key (from 0 to tiers - 1), a budget of 0 means
+    the cache is never evicted.
+    """
+
+    def __init__(self, budget, sizeof, tier=lambda key: 0, tiers=1):
+        self.budget = budget
+        self.sizeof = sizeof
+        self.tier = tier
+        self.size = 0
+        self._entries = {}
+        self._tiers = [OrderedDict() for i in range(tiers)]
+
+    def __getitem__(self, key):
+        lru = self._tiers[self._entries[key][0]]
+        # move the value at the end of the lru order
+        value = lru.pop(key)
+        lru[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+
+        size = self.sizeof(value)
+        self._make_room(size)
+
+        tier = self.tier(key)
+        self._tiers[tier][key] = value
+        self._entries[key] = (tier, size)
+        self.size += size
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __delitem__(self, key):
+        self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        tier, size = self._entries.pop(key)
+        del self._tiers[tier][key]
+        self.size -= size
+
+    def _make_room(self, size):
+        """ evict values until a new value of this size fits in the budget
+        """
+        if not self.budget:
+            return
+
+        for lru in self._tiers:
+            while lru and self.size + size > self.budget:
+                key = next(iter(lru))
+                self._remove(key)
+                logging.debug('cache evicted ' + str(key))
+
+    def clear(self):
+        """ remove all the values from the cache
+        """
+        self.size = 0
+        self._entries.clear()
+        for lru in self._tiers:
+            lru.clear()
+
+
+def memoize(function, cache=None):
     """
     Any function decorated with memoize will cache it's results and send them
     directly when called with same parameters as before, without calling the
     actual code, please only use with functions which result depend only of
     parameters (not time, state of the game or such).
+
+    The cache is a dict by default, any object providing __getitem__ and
+    __setitem__ can be passed instead (see memoize_with), it is available as
+    the cache attribute of the decorated function, and its CacheStats as the
+    stats attribute.
     """
-    cache = {}
+    if cache is None:
+        cache = {}
+
+    counters = CacheStats(
+            function.__module__ + '.' + function.__name__, cache)
+    _STATS.append(counters)
 
     @wraps(function)
     def decorated_function(*args, **kwargs):
         """ this docstring will be replaced by function's one when decorator is
         used
         """
-        params = (args) + tuple(zip(kwargs.keys(), kwargs.values()))
+        # keyword arguments are sorted, so the order they are given in doesn't
+        # create a different entry
+        params = (args) + tuple(sorted(kwargs.items()))
         try:
-            return cache[params]
+            val = cache[params]
+            counters.hits += 1
+            return val
 
         except KeyError:
+            start = time.time()
             val = function(*args, **kwargs)
+            counters.misses += 1
+            counters.miss_time += time.time() - start
             try:
                 cache[params] = val
 
@@ -79,5 +257,22 @@ def memoize(function):
 
             return val
 
+    decorated_function.cache = cache
+    decorated_function.stats = counters
     return decorated_function
 
+
+def memoize_with(cache):
+    """
+    Same as memoize, but store the results in the passed cache, usage::
+
+        @memoize_with(SizedCache(2 ** 20, len))
+        def my_determinist_pure_function(*args, **kwargs):
+            do stuff
+    """
+    def decorator(function):
+        """ the actual decorator
+        """
+        return memoize(function, cache)
+
+    return decorator
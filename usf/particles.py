@@ -27,6 +27,9 @@ from math import pi, sin, cos
 from random import random
 from loaders import image
 
+# particles fade out in this number of steps
+ALPHA_STEPS = 10
+
 class Particle(object):
     '''
     A particle object is used as a part of a flow of particles to render
@@ -47,17 +50,6 @@ class Particle(object):
         self.position[1] += sin(self.direction) * self.speed
         self.speed = max(0, self.speed - friction * deltatime)
 
-    def draw(self, surface, texture, pos, zoom, lifetime):
-        real_coords = (int(self.position[0] * zoom) + pos[0],
-                int(self.position[1] * zoom) + pos[1])
-
-        surface.blit(
-                image(
-                    'data/'+texture,
-                    zoom=zoom,
-                    alpha=1-int(10*self.age/lifetime)/10.0)[0],
-                    real_coords)
-
 
 class ParticlesGenerator(object):
     ''' A simple particle generator implementation for levels, Particle
@@ -128,6 +120,9 @@ class ParticlesGenerator(object):
         self.time_accumulator = 0
         self.particles = set()
         self.frac = 1.0/self.params['rate']
+        # the texture at each step of alpha, for the last zoom used
+        self.ramp_zoom = None
+        self.ramp = None
 
 
     def update(self, deltatime):
@@ -154,14 +149,38 @@ class ParticlesGenerator(object):
                 p['speed'],
                 p['direction'] + p['direction_delta'] * (random() - .5)))
 
+    def get_ramp(self, zoom):
+        """ return the texture at zoom, for each step of alpha, from opaque to
+        invisible, they are only looked for when the zoom changes.
+        """
+        if zoom != self.ramp_zoom:
+            self.ramp_zoom = zoom
+            self.ramp = [
+                    image(
+                        'data/' + self.params['image'],
+                        zoom=zoom,
+                        alpha=1 - step / float(ALPHA_STEPS))[0]
+                    for step in xrange(ALPHA_STEPS + 1)]
+        return self.ramp
+
     def draw(self, surface, pos, zoom):
         """ draw existing particles on surface, needs position and zoom of the
-        camera.
+        camera, all the particles are sent in one blits() call.
         """
-        for p in self.particles:
-            p.draw(
-                    surface,
-                    self.params['image'],
-                    pos,
-                    zoom,
-                    self.params['lifetime'])
+        ramp = self.get_ramp(zoom)
+        lifetime = self.params['lifetime']
+        blits = [
+                (
+                    ramp[min(ALPHA_STEPS,
+                        int(ALPHA_STEPS * p.age / lifetime))],
+                    (
+                        int(p.position[0] * zoom) + pos[0],
+                        int(p.position[1] * zoom) + pos[1]))
+                for p in self.particles]
+
+        if hasattr(surface, 'blits'):
+            surface.blits(blits, False)
+        else:
+            # pygame < 1.9.4
+            for texture, coords in blits:
+                surface.blit(texture, coords)
@@ -0,0 +1,270 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+Update the entities of the game, and integrate their physics:
+
+    physics.update(players, deltatime, gametime, game)
+
+For each entity, in order, its skin is updated and the forces the level
+applies on it are computed (Entity.physics_forces), then the vectors and
+places of all the entities are integrated, then each one, in order, collides
+the map.
+
+By default the integration is done by each entity (Entity.integrate). With
+the numpy backend (see backend below), the place, vector, walking vector and flags of the
+entities are kept in the rows of arrays (Bodies), the entities read and
+write them there, and they are all integrated at once. Both give the same
+results, see tests/physics.py.
+'''
+
+import logging
+
+from usf import CONFIG
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# 'python' or 'numpy'. With the few entities of a match, the numpy backend
+# is slower than the python one (binding the entities makes each use of their
+# place or vector cost more than the arrays save), so it's not an option of
+# the config, profiler.py --physics numpy measures it again.
+backend = 'python'
+
+_warned = []
+
+
+def batched():
+    """ return True if the physics are integrated with numpy
+    """
+    if backend != 'numpy':
+        return False
+
+    if numpy is None:
+        if not _warned:
+            logging.warning('numpy is not installed, using python physics')
+            _warned.append(True)
+        return False
+
+    return True
+
+
+def update(entities, deltatime, gametime, game):
+    """ update the entities, like Entity.update would
+    """
+    present = []
+    forces = []
+    for entity in entities:
+        entity.update(deltatime, gametime, game, integrate=False)
+        if entity.present:
+            present.append(entity)
+            forces.append(entity.physics_forces(deltatime, game))
+
+    if batched():
+        bodies.forget(game.players + game.items)
+        bodies.integrate(present, forces, deltatime)
+    else:
+        for entity, (floor, environnement, friction) in zip(present, forces):
+            entity.integrate(deltatime, floor, environnement, friction)
+
+    for entity in present:
+        entity.collide_world(game)
+
+
+class _Column(object):
+    """
+    An attribute of a bound entity, kept in a column of the arrays of
+    Bodies, kind is 'view' for a row the entity can change in place (its
+    vector), 'tuple' for a copy (its place), or 'flag'.
+    """
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+
+    def __get__(self, entity, owner):
+        if entity is None:
+            return self
+
+        bodies, row = entity._body
+        value = getattr(bodies, self.name)[row]
+        if self.kind == 'view':
+            return value
+        elif self.kind == 'tuple':
+            return tuple(value.tolist())
+        return bool(value)
+
+    def __set__(self, entity, value):
+        bodies, row = entity._body
+        getattr(bodies, self.name)[row] = value
+
+
+# the attributes of the entities kept in the arrays, and their columns
+COLUMNS = {
+        '_place': _Column('place', 'tuple'),
+        '_vector': _Column('vector', 'view'),
+        '_walking_vector': _Column('walking', 'tuple'),
+        '_gravity': _Column('gravity', 'flag'),
+        '_physic': _Column('physic', 'flag'),
+        '_on_ground': _Column('on_ground', 'flag'),
+        '_reversed': _Column('reversed', 'flag')}
+
+_bound_classes = {}
+
+
+def _bound_class(cls):
+    """ return the subclass of cls whose instances keep their physics in
+    Bodies, an entity is given this class when it's bound, so the entities
+    that are not don't pay for the columns each time they use an attribute.
+    """
+    if cls not in _bound_classes:
+        _bound_classes[cls] = type(cls.__name__, (cls,), dict(COLUMNS))
+        _bound_classes[_bound_classes[cls]] = _bound_classes[cls]
+    return _bound_classes[cls]
+
+
+class Bodies(object):
+    """
+    The physics of the entities, in arrays with a row for each bound entity,
+    kept from one step to the next.
+    """
+
+    def __init__(self, size=16):
+        self.rows = {}
+        self.free = []
+        self.size = 0
+        self.place = None
+        self.vector = None
+        self.walking = None
+        self.gravity = None
+        self.physic = None
+        self.on_ground = None
+        self.reversed = None
+        self.grow(size)
+
+    def grow(self, size):
+        """ make room for size entities, keeping the rows used
+        """
+        def resized(array, shape, dtype):
+            result = numpy.zeros(shape, dtype)
+            if array is not None:
+                result[:self.size] = array
+            return result
+
+        self.place = resized(self.place, (size, 2), float)
+        self.vector = resized(self.vector, (size, 2), float)
+        self.walking = resized(self.walking, (size, 2), float)
+        self.gravity = resized(self.gravity, size, bool)
+        self.physic = resized(self.physic, size, bool)
+        self.on_ground = resized(self.on_ground, size, bool)
+        self.reversed = resized(self.reversed, size, bool)
+
+        self.free.extend(reversed(xrange(self.size, size)))
+        self.size = size
+
+    def bind(self, entity):
+        """ return the row of the entity, moving its physics attributes there
+        if it has none yet
+        """
+        if entity in self.rows:
+            return self.rows[entity]
+
+        if not self.free:
+            self.grow(self.size * 2)
+
+        row = self.free.pop()
+        attributes = entity.__dict__
+        self.place[row] = attributes.pop('_place')[:2]
+        self.vector[row] = attributes.pop('_vector')
+        self.walking[row] = attributes.pop('_walking_vector')
+        self.gravity[row] = attributes.pop('_gravity')
+        self.physic[row] = attributes.pop('_physic')
+        self.on_ground[row] = attributes.pop('_on_ground')
+        self.reversed[row] = attributes.pop('_reversed')
+
+        attributes['_body'] = (self, row)
+        entity.__class__ = _bound_class(entity.__class__)
+        self.rows[entity] = row
+        return row
+
+    def unbind(self, entity):
+        """ give its physics attributes back to the entity, and free its row
+        """
+        row = self.rows.pop(entity)
+        attributes = entity.__dict__
+        del attributes['_body']
+        entity.__class__ = entity.__class__.__bases__[0]
+
+        attributes['_place'] = tuple(self.place[row].tolist())
+        attributes['_vector'] = self.vector[row].tolist()
+        attributes['_walking_vector'] = tuple(self.walking[row].tolist())
+        attributes['_gravity'] = bool(self.gravity[row])
+        attributes['_physic'] = bool(self.physic[row])
+        attributes['_on_ground'] = bool(self.on_ground[row])
+        attributes['_reversed'] = bool(self.reversed[row])
+        self.free.append(row)
+
+    def forget(self, entities):
+        """ unbind the entities that are not in entities anymore (items that
+        are gone, entities of an older game)
+        """
+        kept = set(entities)
+        for entity in self.rows.keys():
+            if entity not in kept:
+                self.unbind(entity)
+
+    def integrate(self, entities, forces, deltatime):
+        """ apply the forces returned by physics_forces, gravity and air
+        friction to the vectors of the entities, and their vectors to their
+        places, like Entity.integrate does.
+        """
+        if not entities:
+            return
+
+        rows = numpy.array([self.bind(entity) for entity in entities])
+        floor = numpy.array([f[0] for f in forces], dtype=float)
+        environnement = numpy.array([f[1] for f in forces], dtype=float)
+        friction = numpy.array([f[2] for f in forces], dtype=float)
+
+        vector = self.vector[rows] + environnement
+        place = self.place[rows] + floor
+
+        # Gravity
+        physic = self.physic[rows]
+        falling = self.gravity[rows] & physic & ~self.on_ground[rows]
+        vector[falling, 1] += float(CONFIG.general.GRAVITY) * deltatime
+        #FIXME : it is a bit hackish
+        vector[~physic, 1] += -0.00001
+
+        # Application of air friction.
+        f = CONFIG.general.AIR_FRICTION * friction[physic]
+        vector[physic] -= f[:, None] * vector[physic] * deltatime
+
+        # apply the vector to entity, relatively to its direction.
+        direction = numpy.where(self.reversed[rows], -1.0, 1.0)
+        place[:, 0] += direction * vector[:, 0] * deltatime
+        place[:, 1] += vector[:, 1] * deltatime
+
+        self.vector[rows] = vector
+        self.place[rows] = place
+
+
+bodies = numpy is not None and Bodies() or None
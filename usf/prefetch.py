@@ -0,0 +1,304 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+This module decodes the images and sounds a match can use before they are
+needed, so the first trail or "smash-up" of a character doesn't stop the game
+while its png is read.
+
+Files are decoded by a few worker threads, but the conversion to the display
+format has to be done in the main thread: update() does it a few milliseconds
+at a time, and finish() does all that remains, when the files are needed now.
+
+    prefetcher.add_level('biglevel')
+    prefetcher.add_character('characters/stick-tiny')
+    ...
+    # in the main loop
+    prefetcher.update()
+
+'''
+
+import logging
+import os
+import threading
+import time
+from Queue import Queue, Empty
+from xml.etree import ElementTree
+
+import pygame
+
+from usf import loaders
+from usf import CONFIG
+
+# images used by every match, whatever the level and the characters
+MISC_IMAGES = ('hud.png', 'heart.png', 'progress_bar.png',
+        'progress_bar_bg.png', 'shield.png')
+
+
+def character_dir(player):
+    """ return the directory of a character from a player name, which can have
+    an AI prefix, like 'characters/AI5stick-tiny'
+    """
+    head, tail = os.path.split(player)
+    if tail.startswith('AI'):
+        tail = tail[2:].lstrip('0123456789')
+    return os.path.join(head, tail)
+
+
+def character_assets(dir_name):
+    """ return the images (frames and trails) and the sounds of a character,
+    with the same paths as EntitySkin
+    """
+    path = os.path.join(CONFIG.system_path, dir_name)
+    root = ElementTree.ElementTree(
+            None,
+            os.path.join(
+                path,
+                dir_name.split(os.sep)[-1] + os.extsep + 'xml')).getroot()
+
+    images = [os.path.join(path, root.attrib['image'])]
+    sounds = []
+    for movement in root.findall('movement'):
+        for frame in movement.findall('frame'):
+            images.append(os.path.join(path, frame.attrib['image']))
+            if 'trails' in frame.attrib:
+                images.extend(
+                        os.path.join(path, x)
+                        for x in frame.attrib['trails'].split(','))
+
+        for sound in movement.findall('sound'):
+            sounds.append(os.path.join(path, sound.attrib['filename']))
+
+    return images, sounds
+
+
+def level_assets(levelname):
+    """ return the images of a level: background, middle and foreground, the
+    textures of the blocs, the decorums and the particles, with the same paths
+    as Level
+    """
+    path = os.path.join(CONFIG.system_path, 'levels', levelname)
+    root = ElementTree.ElementTree(
+            None, os.path.join(path, 'level.xml')).getroot()
+
+    images = [
+            os.path.join(path, root.attrib[attrib])
+            for attrib in ('background', 'middle', 'foreground')
+            if attrib in root.attrib]
+
+    for block in root.findall('moving-block') + root.findall('vector-block'):
+        for attrib in ('texture', 'texture_fg'):
+            if attrib in block.attrib:
+                texture = os.path.join(path, block.attrib[attrib])
+                if not os.path.exists(texture):
+                    texture = os.path.join(
+                            CONFIG.system_path,
+                            'levels',
+                            'common',
+                            block.attrib[attrib])
+                images.append(texture)
+
+    for decorum in root.findall('decorum'):
+        images.extend(
+                'data/' + frame.attrib['image']
+                for frame in decorum.findall('frame'))
+
+    for generator in root.findall('particle-generator'):
+        images.append('data/' + generator.attrib.get('image', 'misc/hit.png'))
+
+    return images
+
+
+class Prefetcher(object):
+    """
+    Decode images and sounds in worker threads, and give them to loaders in
+    the main thread.
+
+    progress() is the part of the files asked since the prefetcher was last
+    idle that are ready, it can be read from any thread.
+
+    Only the last level asked is kept: the files of the levels asked before it
+    that are not decoded yet are dropped.
+    """
+
+    def __init__(self, workers):
+        self.workers = workers
+        self.threads = []
+        self.todo = Queue()
+        self.decoded = Queue()
+        # name: level of the files asked, None for the other ones
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.total = 0
+        self.done = 0
+
+    @property
+    def busy(self):
+        return self.done < self.total
+
+    def progress(self):
+        """ return the part of the asked files that are ready, between 0 and 1
+        """
+        if not self.total:
+            return 1.0
+        return float(self.done) / self.total
+
+    def _start(self):
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def _work(self):
+        """ decode files until the end of the program
+        """
+        while True:
+            name, kind = self.todo.get()
+            with self.lock:
+                if name not in self.pending:
+                    # dropped
+                    continue
+
+            try:
+                if kind == 'image':
+                    value = loaders.decode(name)
+                else:
+                    value = pygame.mixer.Sound(name)
+
+            except Exception, e:
+                # loaders will raise the error if the file is really used
+                logging.debug('cannot prefetch ' + name + ': ' + str(e))
+                value = None
+
+            self.decoded.put((name, kind, value))
+
+    def _cached(self, name, kind):
+        if kind == 'image':
+            return (name,) in loaders._image.cache
+        return (name,) in loaders.track.cache
+
+    def add(self, images=(), sounds=(), level=None):
+        """ ask for files to be decoded, the ones already loaded or asked are
+        ignored. level is the level they are asked for, if any.
+        """
+        if not self.busy:
+            self.total = self.done = 0
+
+        with self.lock:
+            for kind, names in (('image', images), ('sound', sounds)):
+                for name in names:
+                    if name in self.pending:
+                        if self.pending[name] is not None:
+                            self.pending[name] = level
+                    elif not self._cached(name, kind):
+                        self.pending[name] = level
+                        self.todo.put((name, kind))
+                        self.total += 1
+
+        if self.busy:
+            self._start()
+
+    def add_character(self, player):
+        """ ask for the frames, trails and sounds of a character
+        """
+        try:
+            self.add(*character_assets(character_dir(player)))
+        except (IOError, SyntaxError), e:
+            logging.warning('cannot prefetch ' + player + ': ' + str(e))
+
+    def drop_levels(self, levelname=None):
+        """ forget the files of the levels other than levelname that are not
+        decoded yet
+        """
+        with self.lock:
+            for name, level in self.pending.items():
+                if level not in (None, levelname):
+                    del self.pending[name]
+                    self.total -= 1
+
+    def add_level(self, levelname):
+        """ ask for the images of a level, instead of the ones of the levels
+        asked before
+        """
+        self.drop_levels(levelname)
+        try:
+            self.add(level_assets(levelname), level=levelname)
+        except (IOError, SyntaxError), e:
+            logging.warning('cannot prefetch ' + levelname + ': ' + str(e))
+
+    def add_match(self, levelname, players):
+        """ ask for everything a match can use
+        """
+        self.add([
+            os.path.join(CONFIG.system_path, 'misc', name)
+            for name in MISC_IMAGES])
+
+        self.add_level(levelname)
+        for player in players:
+            if player:
+                self.add_character(player)
+
+    def _store(self, name, kind, value):
+        """ convert a decoded file, putting it in the loaders caches
+        """
+        with self.lock:
+            if name not in self.pending:
+                # dropped, or decoded twice
+                return
+            del self.pending[name]
+
+        self.done += 1
+        if value is None:
+            return
+
+        loaders.DECODED[name] = value
+        try:
+            if kind == 'image':
+                loaders.image(name)
+            else:
+                loaders.track(name)
+        finally:
+            # the file may have been loaded another way in the meantime
+            loaders.DECODED.pop(name, None)
+
+    def update(self, budget=None):
+        """ convert the decoded files, during at most budget milliseconds
+        (PREFETCH_BUDGET by default), return True if there is still work to do
+        """
+        if budget is None:
+            budget = CONFIG.general.PREFETCH_BUDGET
+
+        end = time.time() + budget / 1000.0
+        while self.busy and time.time() < end:
+            try:
+                self._store(*self.decoded.get_nowait())
+            except Empty:
+                break
+
+        return self.busy
+
+    def finish(self):
+        """ wait for all the asked files, and convert them
+        """
+        while self.busy:
+            self._store(*self.decoded.get())
+
+
+prefetcher = Prefetcher(CONFIG.general.PREFETCH_WORKERS)
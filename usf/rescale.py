@@ -0,0 +1,184 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+Scale big images without stopping the game: while a worker thread smoothscales
+the image to a new size, the closest size already computed is scaled (fast but
+ugly) to the right one, and the exact image replaces it as soon as it's ready.
+
+    img = rescaler.image(level_image, (width, height), crop=tile)[0]
+
+The scaled images are computed from the smallest halved version of the image
+(see loaders._mip) still bigger than them, the crop is taken from that
+version, so the full size crops are never kept in the cache.
+
+With ASYNC_RESCALE (or SMOOTHSCALE) disabled, the images are scaled right
+away.
+'''
+
+import threading
+from Queue import Queue, Empty
+
+import pygame
+
+from usf import loaders
+from usf import CONFIG
+
+
+def source(name, crop, size):
+    """ return the part of the smallest halved version of the image that holds
+    crop (the whole image if it's None), and is still bigger than size.
+    """
+    if crop is None:
+        crop = tuple(loaders.image(name)[1][2:]) + (0, 0)
+    width, height, x, y = crop
+
+    zoom = max(float(size[0]) / max(1, width), float(size[1]) / max(1, height))
+    level = 0
+    while 0 < zoom <= .5:
+        zoom *= 2
+        level += 1
+
+    img = loaders.image(name, mip=level)[0]
+    scale = 2 ** level
+    left = x / scale
+    top = y / scale
+    # round the far borders up, not to lose the last pixels
+    rect = pygame.Rect(
+            left,
+            top,
+            max(1, -(-(x + width) / scale) - left),
+            max(1, -(-(y + height) / scale) - top)).clip(img.get_rect())
+
+    return img.subsurface(rect)
+
+
+def scaled(name, crop, size):
+    """ scale the crop of the image to size, from its source, and put it in
+    the cache
+    """
+    img = source(name, crop, size)
+    if CONFIG.general.SMOOTHSCALE:
+        img = pygame.transform.smoothscale(img, size)
+    else:
+        img = pygame.transform.scale(img, size)
+
+    loaders.store(img, name, crop=crop, scale=size)
+    return img, img.get_rect()
+
+
+class Rescaler(object):
+    """
+    Compute scaled images in a worker thread, and put them in the loaders
+    cache when they are done.
+    """
+
+    def __init__(self):
+        # the (name, crop) waiting for the worker, and the last size asked for
+        # each one in jobs, during a camera move only the last zoom is
+        # computed, not every one the camera went through.
+        self.todo = Queue()
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.done = Queue()
+        self.pending = set()
+        # the sizes asked for each image, where to look for a fallback
+        self.sizes = {}
+        self.thread = None
+
+    def _work(self):
+        while True:
+            name, crop = self.todo.get()
+            with self.lock:
+                size, source = self.jobs.pop((name, crop))
+
+            self.done.put(
+                    (name, crop, size,
+                        pygame.transform.smoothscale(source, size)))
+
+    def _collect(self):
+        """ put the images computed since the last call in the cache
+        """
+        while True:
+            try:
+                name, crop, size, img = self.done.get_nowait()
+            except Empty:
+                break
+
+            loaders.store(img, name, crop=crop, scale=size)
+            self.pending.discard((name, crop, size))
+
+    def _ask(self, name, crop, size):
+        """ start computing an image in the worker thread, instead of the
+        size asked before for the same image if it's not started yet
+        """
+        self.pending.add((name, crop, size))
+        # a copy, the worker must not lock a surface the game draws from
+        job = size, source(name, crop, size).copy()
+        with self.lock:
+            if (name, crop) in self.jobs:
+                # not started yet, replace it
+                self.pending.discard((name, crop, self.jobs[name, crop][0]))
+            else:
+                self.todo.put((name, crop))
+            self.jobs[name, crop] = job
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def image(self, name, size, crop=None):
+        """ return the image (or the crop of it) scaled to size, and its rect,
+        like loaders.image, if it's not ready, return an approximation instead.
+        """
+        size = tuple(size)
+        if loaders.cached(name, crop=crop, scale=size):
+            return loaders.image(name, crop=crop, scale=size)
+
+        if not (CONFIG.general.ASYNC_RESCALE and CONFIG.general.SMOOTHSCALE):
+            return scaled(name, crop, size)
+
+        self._collect()
+        sizes = self.sizes.setdefault((name, crop), set())
+        sizes.add(size)
+
+        img = source(name, crop, size)
+        if img.get_size() == size:
+            return img, img.get_rect()
+
+        if (name, crop, size) not in self.pending:
+            self._ask(name, crop, size)
+
+        closest = None
+        for other in sizes:
+            if (other != size
+                    and (closest is None
+                        or abs(other[0] - size[0]) < abs(closest[0] - size[0]))
+                    and loaders.cached(name, crop=crop, scale=other)):
+                closest = other
+
+        if closest is not None:
+            img = loaders.image(name, crop=crop, scale=closest)[0]
+
+        img = pygame.transform.scale(img, size)
+        return img, img.get_rect()
+
+
+rescaler = Rescaler()
@@ -36,6 +36,7 @@ from usf.widgets.checkbox_text import TextCheckBox
 from usf.translation import _
 
 from usf import entity_skin
+from usf.prefetch import prefetcher
 import os
 from os.path import join
 
@@ -133,6 +134,12 @@ class Characters(Screen):
             player_number = self.player_spinner.index(action)
 
             self.players[player_number] = action.get_index()
+            if action.get_index() != 0:
+                # start decoding its trails and sounds while the player
+                # chooses the others
+                prefetcher.add_character(
+                        self.game_data['character_file'][action.get_index()])
+
             #change the portrait
             self.portraits[player_number].setImage(
                         join(
@@ -34,6 +34,7 @@ from usf.screens.screen import Screen
 from usf.widgets.box import VBox
 from usf.widgets.button import Button
 from usf.widgets.coverflow import Coverflow
+from usf.prefetch import prefetcher
 
 
 from usf import CONFIG
@@ -72,6 +73,17 @@ class Level(Screen):
                 margin_left=20,
                 margin=20)
 
+        self.prefetched = None
+
+    def update(self):
+        super(Level, self).update()
+
+        # start decoding the level shown, while the player looks at it
+        if (not self.coverflow.in_anim
+                and self.get_level() != self.prefetched):
+            self.prefetched = self.get_level()
+            prefetcher.add_level(self.prefetched)
+
     def get_level(self):
         return self.coverflow.get_value()
 
@@ -32,6 +32,7 @@ import pygame
 # Our modules
 from usf import loaders
 from usf import CONFIG
+from usf.widgets.widget import invalidate_rect
 
 
 class Skin (object):
@@ -73,6 +74,19 @@ class Skin (object):
             pygame.display.get_surface().blit(
                     layer.get_image(), layer.get_pos())
 
+    def invalidate_layers(self):
+        """ ask for the parts of the screen where a layer moved or changed
+        since the last call to be drawn again
+        """
+        for layer in self.layer:
+            image = layer.get_image()
+            rect = image.get_rect(topleft=layer.get_pos())
+            if layer.drawn is None or layer.drawn != (image, rect):
+                if layer.drawn is not None:
+                    invalidate_rect(layer.drawn[1])
+                invalidate_rect(rect)
+                layer.drawn = (image, rect)
+
 
 class Layer(object):
     """
@@ -97,6 +111,8 @@ class Layer(object):
 
     def __init__(self, node):
         self.last_update = 0
+        # image and rect of the layer the last time it was invalidated
+        self.drawn = None
         self.current = 0
         sizex = int(node.attrib["sizex"]) * CONFIG.general.WIDTH/800
         sizey = int(node.attrib["sizey"]) * CONFIG.general.HEIGHT/600
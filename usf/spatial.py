@@ -0,0 +1,138 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+A spatial hash splits the level in square cells, and keeps for each cell the
+rects overlapping it, so a collision test only looks at the rects near the
+tested one, instead of every rect of the level.
+
+Rects are added by owner (a block, or the level for its static map), and the
+rects of an owner can be replaced when it moves:
+
+    index = SpatialHash()
+    index.set(level, level.map)
+    index.set(block, block.collide_rects)
+    index.collide(pygame.Rect(x, y, 1, 1))
+
+For the things that all move (the players and items hitting each other), the
+pairs of rects that overlap are found with a sort and sweep on x instead:
+
+    for i, others in enumerate(sweep([e.reach for e in entities])):
+        ...
+
+'''
+
+CELL_SIZE = 128
+
+
+class SpatialHash(object):
+    """
+    A uniform grid of cells, each one listing the (owner, rect) overlapping
+    it.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        # the cells used by each owner, to remove its rects
+        self.owners = {}
+
+    def _cells(self, rect):
+        """ return the coordinates of the cells a rect overlaps
+        """
+        size = self.cell_size
+        x, y, w, h = rect
+        return [
+                (i, j)
+                for i in xrange(x // size, (x + w - 1) // size + 1)
+                for j in xrange(y // size, (y + h - 1) // size + 1)]
+
+    def remove(self, owner):
+        """ remove all the rects of owner
+        """
+        for cell in self.owners.pop(owner, ()):
+            entries = [
+                    entry for entry in self.cells[cell]
+                    if entry[0] is not owner]
+            if entries:
+                self.cells[cell] = entries
+            else:
+                del self.cells[cell]
+
+    def set(self, owner, rects):
+        """ replace the rects of owner
+        """
+        self.remove(owner)
+        cells = set()
+        for rect in rects:
+            for cell in self._cells(rect):
+                self.cells.setdefault(cell, []).append((owner, rect))
+                cells.add(cell)
+
+        self.owners[owner] = cells
+
+    def candidates(self, rect):
+        """ return the (owner, rect) in the cells overlapping rect, a rect can
+        be returned several times
+        """
+        result = []
+        for cell in self._cells(rect):
+            result.extend(self.cells.get(cell, ()))
+        return result
+
+    def collide(self, rect):
+        """ return True if rect collides one of the rects
+        """
+        for cell in self._cells(rect):
+            for owner, other in self.cells.get(cell, ()):
+                if rect.colliderect(other):
+                    return True
+        return False
+
+    def colliding(self, rect):
+        """ return the rects colliding rect, each one once
+        """
+        result = []
+        for owner, other in self.candidates(rect):
+            if rect.colliderect(other) and other not in result:
+                result.append(other)
+        return result
+
+
+def sweep(rects):
+    """ return, for each rect, the sorted list of the indexes of the other
+    rects overlapping it.
+
+    The rects are sorted by their left border, and each one is only tested
+    against the ones before it whose right border is past its left border.
+    """
+    result = [[] for rect in rects]
+    active = []
+    for i in sorted(xrange(len(rects)), key=lambda i: rects[i].left):
+        rect = rects[i]
+        active = [j for j in active if rects[j].right > rect.left]
+        for j in active:
+            if rect.colliderect(rects[j]):
+                result[i].append(j)
+                result[j].append(i)
+        active.append(i)
+
+    for others in result:
+        others.sort()
+    return result
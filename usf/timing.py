@@ -0,0 +1,249 @@
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+'''
+Time the phases of each frame (controls, physics, drawing...), to know which
+one eats the time of a frame on a given level.
+
+    with timer('physics'):
+        self.update_physics()
+    ...
+    # once per frame
+    timer.end_frame()
+
+When TIMINGS is set in the debug section of the config, the percentiles of
+the last frames can be drawn over the game, and every frame of a match is
+written in a csv file in the user directory when it ends. Otherwise, timing a
+phase costs nothing.
+'''
+
+import csv
+import logging
+import os
+import time
+from collections import deque
+
+import pygame
+
+from usf.font import fonts
+from usf import CONFIG
+
+# the number of frames the percentiles are computed on
+WINDOW = 120
+# the time of a frame at 60 fps, in milliseconds, the bars of the overlay are
+# drawn relatively to it
+BUDGET = 1000 / 60.0
+
+
+class _Phase(object):
+    """
+    Add the time spent in a with block to a phase of the frame.
+    """
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, *args):
+        self.timer.add(self.name, time.time() - self.start)
+
+
+class _Paused(object):
+    """
+    Stop timing phases in a with block.
+    """
+
+    def __init__(self, timer):
+        self.timer = timer
+
+    def __enter__(self):
+        self.timer.pauses += 1
+
+    def __exit__(self, *args):
+        self.timer.pauses -= 1
+
+
+class _Nothing(object):
+    """
+    The phase used when timing is disabled.
+    """
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+class PhaseTimer(object):
+    """
+    Collect the time of the phases of each frame, in milliseconds, a phase
+    timed several times in a frame (the game is updated in several steps)
+    counts for the sum of them.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.nothing = _Nothing()
+        # the number of paused blocks the program is in
+        self.pauses = 0
+        self.reset()
+
+    def reset(self):
+        """ forget every recorded frame
+        """
+        # the phases in the order they appeared
+        self.phases = []
+        self.samples = {}
+        self.current = {}
+        self.frames = []
+
+    @property
+    def enabled(self):
+        return CONFIG.debug.TIMINGS
+
+    def __call__(self, name):
+        """ return a context manager timing its block as the phase name
+        """
+        if not self.enabled or self.pauses:
+            return self.nothing
+        return _Phase(self, name)
+
+    def paused(self):
+        """ return a context manager in which no phase is timed, for the
+        updates of the game simulated by the ai, which are counted as the ai
+        phase, not as the phases of the game.
+        """
+        return _Paused(self)
+
+    def add(self, name, seconds):
+        """ add time to a phase of the current frame
+        """
+        if name not in self.samples:
+            self.phases.append(name)
+            self.samples[name] = deque(maxlen=self.window)
+
+        self.current[name] = self.current.get(name, 0) + seconds * 1000
+
+    def end_frame(self):
+        """ record the current frame, and start the next one, a frame without
+        any timed phase (in the menu) is ignored.
+        """
+        if not self.current:
+            return
+
+        for name in self.phases:
+            self.samples[name].append(self.current.get(name, 0))
+
+        self.frames.append(self.current)
+        self.current = {}
+
+    def percentile(self, name, percent):
+        """ return the time of a phase, in milliseconds, that percent % of the
+        last frames didn't exceed
+        """
+        samples = sorted(self.samples.get(name, ()))
+        if not samples:
+            return 0
+        return samples[min(len(samples) - 1, len(samples) * percent / 100)]
+
+    def draw(self, surface, pos=(10, 100)):
+        """ draw the median and 95th percentile of each phase, as text and
+        bars, a full bar is a whole frame at 60 fps
+        """
+        # the font of the fps counter
+        font = fonts['mono']['38']
+        x, y = pos
+        lines = []
+        for name in self.phases:
+            median = self.percentile(name, 50)
+            high = self.percentile(name, 95)
+            lines.append((
+                font.render(
+                    '%-16s %5.2f %5.2f' % (name, median, high),
+                    True,
+                    pygame.color.Color('white')),
+                median,
+                high))
+
+        # the bars begin after the longest text
+        left = x + max([text.get_width() for text, m, h in lines] or [0]) + 10
+        for text, median, high in lines:
+            surface.blit(text, (x, y))
+
+            width = 100
+            # the bars are in the middle of the line
+            top = y + font.get_linesize() / 2 - 4
+            pygame.draw.rect(
+                    surface,
+                    pygame.color.Color('grey'),
+                    (left, top, width, 8),
+                    1)
+            pygame.draw.rect(
+                    surface,
+                    pygame.color.Color('orange'),
+                    (left, top, min(width, int(high * width / BUDGET)), 8))
+            pygame.draw.rect(
+                    surface,
+                    pygame.color.Color('green'),
+                    (left, top, min(width, int(median * width / BUDGET)), 8))
+
+            y += font.get_linesize()
+
+    def dump(self, filename):
+        """ write the time of the phases of every recorded frame in a csv
+        file, one line per frame
+        """
+        try:
+            f = open(filename, 'wb')
+        except IOError, e:
+            logging.warning('cannot write timings: ' + str(e))
+            return
+
+        try:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + self.phases)
+            for i, frame in enumerate(self.frames):
+                writer.writerow(
+                        [i] + ['%.3f' % frame.get(name, 0)
+                            for name in self.phases])
+        finally:
+            f.close()
+
+        logging.info('timings written in ' + filename)
+
+    def dump_match(self, levelname):
+        """ write the timings of the match that just ended in the user
+        directory, and forget them
+        """
+        if self.frames:
+            self.dump(
+                    os.path.join(
+                        CONFIG.user_path,
+                        'timings-%s-%s.csv' % (
+                            levelname,
+                            time.strftime('%Y%m%d-%H%M%S'))))
+        self.reset()
+
+
+timer = PhaseTimer()
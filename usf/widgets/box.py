@@ -21,10 +21,14 @@ Some Box widgets as base for the GUI classes
 
 '''
 
-from usf.widgets.widget import Widget, optimize_size
+import pygame
+
+from usf.widgets.widget import Widget, optimize_size, iter_tree, is_static
+from usf.widgets.widget import invalidate_rect
 from usf.widgets.button import Button
 
 
+from usf import loaders
 from usf import CONFIG
 
 from os.path import join
@@ -35,6 +39,10 @@ class Container(Widget):
     and VBox widget.
     """
     focusable = True
+    # the container and its widgets drawn on a surface, and where to blit it,
+    # relatively to the container
+    cache = None
+    cache_offset = (0, 0)
 
     def __init__(self, orientation, border = False):
         super(Container, self).__init__()
@@ -47,6 +55,8 @@ class Container(Widget):
         This function is used to update the container size after adding a
         widget.
         """
+        # the old place of the container is drawn again too
+        self.invalidate()
         sizex = 0
         sizey = 0
         for widget in self.widgets:
@@ -96,20 +106,82 @@ class Container(Widget):
             widget.update_size()
             widget.update_pos()
 
+        self.forget_cache()
+        self.invalidate()
+
     def draw(self):
         """
         This method draw all widgets surfaces in a surface and return it
+
+        If nothing in the container is animated, they are drawn once in a
+        cache, which is blitted until a widget is invalidated.
+        """
+        if not (CONFIG.display.CACHE_WIDGETS and is_static(self)):
+            self.cache = None
+            self.draw_widgets()
+            return
+
+        if self.cache is None:
+            self.render()
+        self.screen.blit(self.cache, (
+            self.parentpos[0] + self.x + self.cache_offset[0],
+            self.parentpos[1] + self.y + self.cache_offset[1]))
+
+    def forget_cache(self):
+        """
+        Drop the cached drawing of the container, when one of its widgets
+        changed, all the place it covered is drawn again, as the new one can
+        be smaller.
+        """
+        if self.cache is not None:
+            invalidate_rect(self.cache.get_rect(topleft=(
+                self.parentpos[0] + self.x + self.cache_offset[0],
+                self.parentpos[1] + self.y + self.cache_offset[1])))
+            self.cache = None
+
+    def draw_widgets(self):
+        """
+        Draw the container and its widgets on the screen.
         """
         super(Container, self).draw()
         for widget in self.widgets:
             widget.draw()
 
+    def render(self):
+        """
+        Draw the container and its widgets in the cache, the widgets are
+        moved to it for the time of drawing.
+        """
+        tree = list(iter_tree(self))
+        rect = self.rect.unionall([widget.rect for widget in tree])
+        cache = pygame.Surface(rect.size, pygame.locals.SRCALPHA)
+
+        saved = [(widget.screen, widget.parentpos) for widget in tree]
+        try:
+            for widget in tree:
+                widget.screen = cache
+                widget.parentpos = (
+                        widget.parentpos[0] - rect.x,
+                        widget.parentpos[1] - rect.y)
+            self.draw_widgets()
+
+        finally:
+            for widget, (screen, parentpos) in zip(tree, saved):
+                widget.screen = screen
+                widget.parentpos = parentpos
+
+        self.cache = cache
+        self.cache_offset = (
+                rect.x - self.parentpos[0] - self.x,
+                rect.y - self.parentpos[1] - self.y)
+
     def add(self, widget, **kwargs):
         """
         This function is used to add a widget in the container
         """
         self.current_focus = -1
         self.widgets.append(widget)
+        widget.parent = self
         if 'size' in kwargs or type(widget) is Button:
             if 'size' in kwargs:
                 size = kwargs['size']
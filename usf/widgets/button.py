@@ -58,6 +58,7 @@ class Button(Label):
         Set the size of the widget.
         This function is usually called by the container, HBox or VBox.
         """
+        self.invalidate()
         self.height = h
         self.width = w
         super(Button, self).set_size((w, h))
@@ -50,6 +50,7 @@ class CheckBox(Widget):
         Set the size of the widget.
         """
 
+        self.invalidate()
         self.height = h
         self.width = w
         self.surface_static = loaders.image(join(CONFIG.system_path,
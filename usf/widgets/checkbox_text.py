@@ -90,6 +90,7 @@ class TextCheckBox(HBox):
         """
         Set the size of the widget.
         """
+        self.invalidate()
         self.height = h
         self.width = w
 
@@ -53,6 +53,16 @@ class Coverflow(Widget):
     #the animation() function wil be called each frame
     #FIXME: the animation speed souldn't depend of the computer
     animation_speed = True
+    retained = False
+
+    @property
+    def animated(self):
+        return self.in_anim or self.need_update
+
+    @property
+    def rect(self):
+        # the foreground and reflection are drawn on the whole screen
+        return pygame.display.get_surface().get_rect()
 
     def __init__(self, values):
         super(Coverflow, self).__init__()
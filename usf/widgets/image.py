@@ -46,6 +46,7 @@ class Image(Widget):
         (not the value only for 800x480)
         """
 
+        self.invalidate()
         self.height = h
         self.width = w
 
@@ -48,6 +48,7 @@ class ImageButton(Image):
         self.state = False
 
     def set_size(self, (w, h)):
+        self.invalidate()
         self.height = h
         self.width = w
         self.surface_static = loaders.image(
@@ -81,6 +81,8 @@ class Label(Widget):
     def set_text(self, text):
         """ update the text surface
         """
+        # the size can change with the text, the old place is drawn again too
+        self.invalidate()
         self.text = text
         self.surface_text = loaders.text(self.text, fonts['sans']['normal'])
 
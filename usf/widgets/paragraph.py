@@ -38,6 +38,7 @@ class Paragraph(Widget):
     """
 
     animation_speed = 1/30.0
+    animated = True
     def __init__(self, path):
         super(Paragraph, self).__init__()
         self.defil = 0
@@ -94,6 +94,7 @@ class Slider(Widget):
                         x - self.space + self.height < self.width):
                     self.value = 0
 
+                self.invalidate()
                 return self, self
 
             if 0 < x < self.width and 0 < y < self.height:
@@ -116,6 +117,7 @@ class Slider(Widget):
 
     def set_value(self, value):
         self.value = value*(self.width - self.height)/100
+        self.invalidate()
 
     def draw(self):
         if self.state:
@@ -35,6 +35,7 @@ from usf import CONFIG
 class KeyboardWidget(Widget):
     ''' actually it should be KeyWidget, if i get it correctly
     '''
+    _focus = False
 
     def __init__(self, value):
         super(KeyboardWidget, self).__init__()
@@ -49,7 +50,20 @@ class KeyboardWidget(Widget):
         self.state = False
         self.focus = False
 
+    @property
+    def focus(self):
+        """ True when the widget waits for a key
+        """
+        return self._focus
+
+    @focus.setter
+    def focus(self, focus):
+        if focus != self._focus:
+            self._focus = focus
+            self.invalidate()
+
     def set_size(self, (w, h)):
+        self.invalidate()
         self.width = w
         self.height = h
         self.update()
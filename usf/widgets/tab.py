@@ -68,6 +68,7 @@ class Tab(VBox):
                     widget_ = widget.handle_mouse(event)
                     if event.type == pygame.MOUSEBUTTONUP:
                         self.widgets[1] = self.tab_content[self.tab_list.index(widget_)]
+                        self.widgets[1].parent = self
                         self.update_pos()
                         self.update_size()
                     elif widget_:
@@ -41,6 +41,12 @@ class TextEntry(Button):
     """
 
     animation_speed = 1/10.0
+
+    @property
+    def animated(self):
+        # the cursor blinks while we type
+        return self.state
+
     def __init__(self, text, *args, **kwargs):
         super(TextEntry, self).__init__(text, *args, **kwargs)
         self.properties["size_request"] = (220, 20)
@@ -30,6 +30,52 @@ import time
 
 from usf import CONFIG
 
+# the parts of the screen to draw again, in screen coordinates, the gui takes
+# them at each frame
+DIRTY = []
+
+
+def invalidate_rect(rect):
+    """ ask for a part of the screen to be drawn again
+    """
+    DIRTY.append(pygame.Rect(rect))
+
+
+def pop_dirty():
+    """ return the parts of the screen to draw again, and forget them
+    """
+    rects = DIRTY[:]
+    del DIRTY[:]
+    return rects
+
+
+def iter_tree(widget):
+    """ yield a widget and all the widgets it contains
+    """
+    yield widget
+    for child in getattr(widget, 'widgets', ()):
+        for descendant in iter_tree(child):
+            yield descendant
+
+
+def invalidate_animated(widget):
+    """ invalidate the animated widgets of a widget tree, they change at each
+    frame without telling it
+    """
+    for descendant in iter_tree(widget):
+        if descendant.animated:
+            descendant.invalidate()
+
+
+def is_static(widget):
+    """ return True if nothing in the widget tree changes without being
+    invalidated, so it can be drawn from a cache
+    """
+    for descendant in iter_tree(widget):
+        if descendant.animated or not descendant.retained:
+            return False
+    return True
+
 
 class Widget(object):
     """
@@ -49,6 +95,14 @@ class Widget(object):
     last_animation = 0.0
     properties = {}
     focusable = False
+    # an animated widget is drawn again at each frame
+    animated = False
+    # False if the widget draws outside of its rect, so it can't be cached
+    retained = True
+    # the container of the widget
+    parent = None
+    _state = False
+    _surface = None
 
     def __init__(self):
         """
@@ -58,6 +112,47 @@ class Widget(object):
         self.surface = pygame.Surface((self.width, self.height))
         self.screen = pygame.display.get_surface()
 
+    @property
+    def rect(self):
+        """ the place of the widget on the screen
+        """
+        return pygame.Rect(
+                self.parentpos[0] + self.x,
+                self.parentpos[1] + self.y,
+                self.width,
+                self.height)
+
+    def invalidate(self):
+        """ ask for the widget to be drawn again, this is done when its state
+        or surface change, widgets changing in other ways have to call it.
+        The containers of the widget forget their cache.
+        """
+        invalidate_rect(self.rect)
+        parent = self.parent
+        while parent is not None:
+            parent.forget_cache()
+            parent = parent.parent
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        if state != self._state:
+            self._state = state
+            self.invalidate()
+
+    @property
+    def surface(self):
+        return self._surface
+
+    @surface.setter
+    def surface(self, surface):
+        if surface is not self._surface:
+            self._surface = surface
+            self.invalidate()
+
     def draw(self):
         """
         Return the widget surface. This fonction is often overrided.
@@ -71,6 +166,8 @@ class Widget(object):
         """
         This function is used to resize a widget.
         """
+        # the place it used before is drawn again too
+        self.invalidate()
         self.height = h
         self.width = w
 
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+################################################################################
+# copyright 2008-2011 Gabriel Pettier <gabriel.pettier@gmail.com>              #
+#                                                                              #
+# This file is part of UltimateSmashFriends                                    #
+#                                                                              #
+# UltimateSmashFriends is free software: you can redistribute it and/or modify #
+# it under the terms of the GNU General Public License as published by         #
+# the Free Software Foundation, either version 3 of the License, or            #
+# (at your option) any later version.                                          #
+#                                                                              #
+# UltimateSmashFriends is distributed in the hope that it will be useful,      #
+# but WITHOUT ANY WARRANTY; without even the implied warranty of               #
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the                #
+# GNU General Public License for more details.                                 #
+#                                                                              #
+# You should have received a copy of the GNU General Public License            #
+# along with UltimateSmashFriends.  If not, see <http://www.gnu.org/licenses/>.#
+################################################################################
+
+# write the index of the image sizes (see usf/image_index.py) of every
+# character, item and level directory, run it again after changing images.
+#
+# Syntax : ./build_image_index.py [directory...]
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from usf import CONFIG
+from usf import image_index
+
+if len(sys.argv) > 1:
+    directories = sys.argv[1:]
+else:
+    directories = [
+            os.path.join(CONFIG.system_path, kind, name)
+            for kind in ('characters', 'items', 'levels')
+            for name in os.listdir(os.path.join(CONFIG.system_path, kind))
+            if os.path.isdir(os.path.join(CONFIG.system_path, kind, name))]
+
+for directory in directories:
+    count = image_index.build(directory)
+    if count:
+        print directory, count